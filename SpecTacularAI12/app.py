@@ -1,30 +1,73 @@
+import io
 import os
+import logging
+import hashlib
+import re
 import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from flask import Flask, request, jsonify, send_from_directory, render_template_string, redirect, url_for, flash
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
 from src.preprocessing import extract_text_from_pdf, clean_text, split_into_chunks
-from src.semantic_search import build_index, search
+from src.semantic_search import prepare_index, publish_index, search
 from src.validation_engine import ValidationEngine
 from src.mapping_engine import MappingEngine
 from src.traceability_matrix import TraceabilityMatrix
 from src.pdf_generator import PDFGenerator
+from src.query_cache import SemanticQueryCache
+from src.chunk_store import ChunkStore
 
 # Initialize Flask
 app = Flask(__name__, static_folder="web/static", template_folder="web")
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+DEBUG = os.environ.get("FLASK_DEBUG", "").lower() in ("1", "true", "yes")
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_UPLOAD_MB", "50")) * 1024 * 1024
+app.config["UPLOAD_BUFFER_SIZE"] = 1024 * 1024  # 1 MiB copy buffer for uploaded files
 CORS(app)
 
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
+log = logging.getLogger(__name__)
+
+# Requirement ID patterns (REQ-1, FR_2, NFR3, R4) combined so a chunk is scanned once
+_REQ_ID_RE = re.compile(r'(?:REQ[_-]?\d+|FR[_-]?\d+|NFR[_-]?\d+|R\d+)', re.IGNORECASE)
+
 # Global variables
 document_chunks = []
 srs_requirements = []
 test_cases = []
+test_case_ids = set()  # IDs of everything in test_cases, for O(1) duplicate checks
+# Bumped on every change to test_cases / srs_requirements; keys the read-only endpoint caches
+tc_version = 0
+srs_version = 0
 validation_engine = ValidationEngine()
 mapping_engine = MappingEngine()
 traceability_matrix = TraceabilityMatrix()
 pdf_generator = PDFGenerator()
+query_cache = SemanticQueryCache(version=srs_version)
+
+# Guards the globals above when the app is served by a threaded server;
+# query_cache has its own lock, and its entries are tied to srs_version
+state_lock = threading.Lock()
+
+# Background document processing; finished jobs are kept for status polling
+upload_executor = ThreadPoolExecutor(max_workers=2)
+upload_jobs = {}
+MAX_UPLOAD_JOBS = 100
+
+# Extraction results keyed by the SHA-256 of the uploaded file. Bump the
+# version whenever extraction, cleaning, chunking or requirement extraction
+# changes, so documents uploaded before are processed again
+CACHE_FOLDER = os.path.join("data", "cache")
+EXTRACTION_CACHE_VERSION = 1
+MAX_CACHED_DOCUMENTS = 100
+
+# Today's upload folder, so makedirs only runs when the date rolls over
+_save_folder_cache = {"date": None, "path": None}
 
 @app.route("/")
 def index():
@@ -32,8 +75,7 @@ def index():
 
 @app.route("/upload", methods=["POST"])
 def upload():
-    global document_chunks, srs_requirements
-    
+    """Save an uploaded SRS document and process it in the background"""
     if "file" not in request.files:
         return jsonify({"error": "No file provided"}), 400
 
@@ -42,54 +84,117 @@ def upload():
         return jsonify({"error": "Empty filename"}), 400
 
     # Create date-based folder
-    date_folder = datetime.now().strftime("%Y-%m-%d")
-    save_folder = os.path.join("data", date_folder)
-    os.makedirs(save_folder, exist_ok=True)
+    save_folder = _get_save_folder()
 
     # Save uploaded file
     filename = secure_filename(file.filename)
     save_path = os.path.join(save_folder, filename)
-    file.save(save_path)
+    # Hash the content while copying so duplicate uploads can reuse cached results
+    digest = hashlib.sha256()
+    buffer_size = app.config["UPLOAD_BUFFER_SIZE"]
+    with open(save_path, "wb", buffering=0) as dst:
+        while True:
+            block = file.stream.read(buffer_size)
+            if not block:
+                break
+            digest.update(block)
+            dst.write(block)
+
+    job_id = uuid.uuid4().hex
+    with state_lock:
+        upload_jobs[job_id] = {"job_id": job_id, "status": "processing", "savedPath": save_path}
+        # Forget the oldest jobs so the status table stays bounded
+        while len(upload_jobs) > MAX_UPLOAD_JOBS:
+            del upload_jobs[next(iter(upload_jobs))]
+    upload_executor.submit(_process_document, save_path, filename, job_id, digest.hexdigest())
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "processing",
+        "status_url": url_for("upload_status", job_id=job_id),
+        "savedPath": save_path
+    }), 202
+
+@app.route("/upload/status/<job_id>")
+def upload_status(job_id):
+    """Report the progress of a background document upload"""
+    with state_lock:
+        job = upload_jobs.get(job_id)
+        job = dict(job) if job else None
+    if job is None:
+        return jsonify({"error": "Unknown job ID"}), 404
+    return jsonify(job)
+
+def _process_document(save_path, filename, job_id, content_hash):
+    """Extract, chunk and index an uploaded document (runs on upload_executor)"""
+    global document_chunks, srs_requirements, srs_version
 
     try:
-        print(f"Starting processing of {filename}...")
-        
-        # Process document with optimizations
-        raw_text = extract_text_from_pdf(save_path)
-        print(f"Extracted {len(raw_text)} characters")
+        log.debug("Starting processing of %s...", filename)
         
-        clean = clean_text(raw_text)
-        print(f"Cleaned text: {len(clean)} characters")
-        
-        # Use larger chunks for faster processing
-        chunks = split_into_chunks(clean, chunk_size=300)
-        document_chunks = chunks
-        print(f"Created {len(chunks)} chunks")
-        
-        # Extract requirements with enhanced method
-        srs_requirements = mapping_engine.extract_requirements(chunks)
-        print(f"Extracted {len(srs_requirements)} requirements")
+        cache_path = os.path.join(CACHE_FOLDER, f"{EXTRACTION_CACHE_VERSION}-{content_hash}.json")
+        cached = _load_cached_document(cache_path)
+        if cached is not None:
+            chunks, requirements = cached["chunks"], cached["requirements"]
+            log.debug("Reusing cached results for %s", filename)
+        else:
+            # Process document with optimizations
+            raw_text = extract_text_from_pdf(save_path)
+            log.debug("Extracted %d characters", len(raw_text))
+            
+            clean = clean_text(raw_text)
+            log.debug("Cleaned text: %d characters", len(clean))
+            
+            # Use larger chunks for faster processing
+            chunks = split_into_chunks(clean, chunk_size=300)
+            log.debug("Created %d chunks", len(chunks))
+            
+            # Extract requirements with enhanced method
+            requirements = mapping_engine.extract_requirements(chunks)
+            log.debug("Extracted %d requirements", len(requirements))
 
-        # Build embeddings index (optimized)
-        if chunks:  # Only build if we have chunks
-            build_index(chunks)
-            print("Built semantic index")
+            _save_cached_document(cache_path, {"chunks": chunks, "requirements": requirements})
 
-        return jsonify({
-            "message": "Document processed successfully",
-            "chunks": len(chunks),
-            "requirements": len(srs_requirements),
-            "processing_time": "optimized",
-            "savedPath": save_path
-        })
+        # Pack chunk text into one buffer for the long-lived index
+        chunks = ChunkStore(chunks)
+
+        # Build embeddings index (optimized) before taking the lock, so
+        # requests aren't held up while a large document is indexed
+        index = prepare_index(chunks) if chunks else None  # Only build if we have chunks
+
+        with state_lock:
+            document_chunks = chunks
+            srs_requirements = requirements
+            srs_version += 1
+
+            if index is not None:
+                publish_index(index)
+                log.debug("Built semantic index")
+            query_cache.clear(srs_version)
+
+            upload_jobs[job_id] = {
+                "job_id": job_id,
+                "status": "completed",
+                "message": "Document processed successfully",
+                "chunks": len(chunks),
+                "requirements": len(requirements),
+                "processing_time": "optimized",
+                "savedPath": save_path
+            }
     except Exception as e:
-        print(f"Processing error: {str(e)}")
-        return jsonify({"error": f"Processing failed: {str(e)}"}), 500
+        log.error("Processing error: %s", e)
+        with state_lock:
+            upload_jobs[job_id] = {
+                "job_id": job_id,
+                "status": "failed",
+                "error": f"Processing failed: {str(e)}",
+                "savedPath": save_path
+            }
 
 @app.route("/upload_testcases", methods=["POST"])
 def upload_testcases():
     """Upload existing test cases file for comparison"""
-    global test_cases
+    global tc_version
     
     if "file" not in request.files:
         return jsonify({"error": "No file provided"}), 400
@@ -99,35 +204,37 @@ def upload_testcases():
         return jsonify({"error": "Empty filename"}), 400
 
     try:
-        # Read JSON test cases
-        content = file.read().decode('utf-8')
-        existing_test_cases = json.loads(content)
+        # Parse JSON test cases straight from the upload stream
+        existing_test_cases = json.load(io.TextIOWrapper(file.stream, encoding='utf-8'))
         
         # Ensure existing_test_cases is a list
         if not isinstance(existing_test_cases, list):
             return jsonify({"error": "Test cases file must contain a JSON array"}), 400
         
         # Merge with current test cases (avoid duplicates by ID)
-        existing_ids = {tc.get('id') if isinstance(tc, dict) else None for tc in test_cases}
-        for tc in existing_test_cases:
-            if isinstance(tc, dict):
-                tc_id = tc.get('id')
-                if tc_id not in existing_ids:
-                    test_cases.append(tc)
-            else:
-                # Handle case where tc is not a dict - convert or skip
-                print(f"Warning: Skipping non-dict test case: {tc}")
+        with state_lock:
+            added = False
+            for tc in existing_test_cases:
+                if not isinstance(tc, dict) or not tc.get('id'):
+                    # Only dicts with an ID are stored, so readers never re-filter
+                    log.warning("Skipping invalid test case: %r", tc)
+                elif tc['id'] not in test_case_ids:
+                    _append_test_case(tc)
+                    added = True
+            if added:
+                tc_version += 1
+            total_test_cases = len(test_cases)
         
         return jsonify({
             "message": "Test cases uploaded successfully",
-            "total_test_cases": len(test_cases)
+            "total_test_cases": total_test_cases
         })
     except Exception as e:
         return jsonify({"error": f"Failed to process test cases: {str(e)}"}), 500
 
 @app.route("/query", methods=["POST"])
 def query():
-    global test_cases
+    global tc_version
     
     data = request.get_json()
     query_text = data.get("query", "").strip()
@@ -135,16 +242,28 @@ def query():
         return jsonify({"error": "Empty query."}), 400
 
     try:
-        # Retrieve top similar chunks
-        retrieved_chunks = search(query_text, top_k=3)
+        # Retrieve top similar chunks (reusing results for repeated queries).
+        # The version is read first: if a document is indexed while this
+        # search runs, the cache discards its results instead of keeping
+        # results of the old index
+        with state_lock:
+            index_version = srs_version
+        retrieved_chunks = query_cache.get(query_text)
+        if retrieved_chunks is None:
+            retrieved_chunks = search(query_text, top_k=3)
+            query_cache.put(query_text, retrieved_chunks, index_version)
 
         # Generate test cases from retrieved text
         generated_test_cases = []
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Per-query fields are built once and shared by every generated test case
+        title = f"Test Case for: {query_text[:50]}..."
+        description = f"Generated test case based on query: {query_text}"
         for i, chunk in enumerate(retrieved_chunks, 1):
             test_case = {
-                "id": f"TC_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{i}",
-                "title": f"Test Case for: {query_text[:50]}...",
-                "description": f"Generated test case based on query: {query_text}",
+                "id": f"TC_{timestamp}_{i}",
+                "title": title,
+                "description": description,
                 "steps": _generate_test_steps(chunk, query_text),
                 "expected": "System should behave as specified in the requirements",
                 "priority": "Medium",
@@ -157,7 +276,10 @@ def query():
             generated_test_cases.append(test_case)
 
         # Add to global test cases list
-        test_cases.extend(generated_test_cases)
+        with state_lock:
+            for test_case in generated_test_cases:
+                _append_test_case(test_case)
+            tc_version += 1
 
         return jsonify({
             "query": query_text,
@@ -170,17 +292,22 @@ def query():
 def validate_test_cases():
     """Validate all test cases"""
     try:
-        # Clean up test cases first
-        valid_test_cases = _clean_test_cases()
+        validation_results = validation_engine.validate_test_cases(test_cases, srs_requirements)
         
-        validation_results = validation_engine.validate_test_cases(valid_test_cases, srs_requirements)
+        # Count valid and invalid results in a single pass
+        valid = invalid = 0
+        for r in validation_results:
+            if r.get('is_valid', False):
+                valid += 1
+            if not r.get('is_valid', True):
+                invalid += 1
         
         return jsonify({
             "validation_results": validation_results,
             "summary": {
-                "total": len(valid_test_cases),
-                "valid": sum(1 for r in validation_results if r.get('is_valid', False)),
-                "invalid": sum(1 for r in validation_results if not r.get('is_valid', True))
+                "total": len(test_cases),
+                "valid": valid,
+                "invalid": invalid
             }
         })
     except Exception as e:
@@ -190,50 +317,53 @@ def validate_test_cases():
 def map_test_cases():
     """Map test cases to requirements"""
     try:
-        # Filter out any non-dict test cases
-        valid_test_cases = [tc for tc in test_cases if isinstance(tc, dict)]
-        
-        if len(valid_test_cases) != len(test_cases):
-            print(f"Warning: Found {len(test_cases) - len(valid_test_cases)} non-dict test cases during mapping")
-        
-        mapping_results = mapping_engine.map_test_cases_to_requirements(valid_test_cases, srs_requirements)
-        
-        return jsonify({
-            "mapping_results": mapping_results,
-            "summary": {
-                "total_test_cases": len(valid_test_cases),
-                "mapped_test_cases": len([m for m in mapping_results if m['mapped_requirements']]),
-                "total_requirements": len(srs_requirements),
-                "covered_requirements": len(set([
-                    req['requirement_id'] 
-                    for m in mapping_results 
-                    for req in m.get('mapped_requirements', [])
-                    if isinstance(req, dict) and 'requirement_id' in req
-                ]))
-            }
-        })
+        return jsonify(_mapping_payload(tc_version, srs_version))
     except Exception as e:
         return jsonify({"error": f"Mapping failed: {str(e)}"}), 500
 
+@lru_cache(maxsize=8)
+def _mapping_payload(tc_ver, srs_ver):
+    """Build the /map response; cached until test cases or requirements change"""
+    mapping_results = mapping_engine.map_test_cases_to_requirements(test_cases, srs_requirements)
+    
+    # Collect mapped test cases and covered requirement IDs in a single pass
+    mapped_test_cases = 0
+    covered_requirements = set()
+    for m in mapping_results:
+        if m['mapped_requirements']:
+            mapped_test_cases += 1
+        for req in m.get('mapped_requirements', ()):
+            if isinstance(req, dict) and 'requirement_id' in req:
+                covered_requirements.add(req['requirement_id'])
+    
+    return {
+        "mapping_results": mapping_results,
+        "summary": {
+            "total_test_cases": len(test_cases),
+            "mapped_test_cases": mapped_test_cases,
+            "total_requirements": len(srs_requirements),
+            "covered_requirements": len(covered_requirements)
+        }
+    }
+
 @app.route("/traceability", methods=["POST"])
 def generate_traceability_matrix():
     """Generate traceability matrix"""
     try:
-        # Filter out any non-dict test cases
-        valid_test_cases = [tc for tc in test_cases if isinstance(tc, dict)]
-        
-        if len(valid_test_cases) != len(test_cases):
-            print(f"Warning: Found {len(test_cases) - len(valid_test_cases)} non-dict test cases during traceability")
-        
-        matrix_data = traceability_matrix.generate_matrix(srs_requirements, valid_test_cases)
-        
-        return jsonify({
-            "matrix": matrix_data,
-            "coverage_stats": traceability_matrix.calculate_coverage_stats(matrix_data)
-        })
+        return jsonify(_traceability_payload(tc_version, srs_version))
     except Exception as e:
         return jsonify({"error": f"Traceability matrix generation failed: {str(e)}"}), 500
 
+@lru_cache(maxsize=8)
+def _traceability_payload(tc_ver, srs_ver):
+    """Build the /traceability response; cached until test cases or requirements change"""
+    matrix_data = traceability_matrix.generate_matrix(srs_requirements, test_cases)
+    
+    return {
+        "matrix": matrix_data,
+        "coverage_stats": traceability_matrix.calculate_coverage_stats(matrix_data)
+    }
+
 @app.route("/export/pdf", methods=["POST"])
 def export_pdf():
     """Export test cases and traceability matrix to PDF"""
@@ -244,8 +374,11 @@ def export_pdf():
         if export_type == "test_cases":
             pdf_path = pdf_generator.generate_test_cases_pdf(test_cases)
         elif export_type == "traceability":
-            matrix_data = traceability_matrix.generate_matrix(srs_requirements, test_cases)
-            pdf_path = pdf_generator.generate_traceability_pdf(matrix_data)
+            # Same matrix and stats as /traceability, so they are built at most once per change
+            payload = _traceability_payload(tc_version, srs_version)
+            pdf_path = pdf_generator.generate_traceability_pdf(
+                payload["matrix"], coverage_stats=payload["coverage_stats"]
+            )
         elif export_type == "validation":
             validation_results = validation_engine.validate_test_cases(test_cases, srs_requirements)
             pdf_path = pdf_generator.generate_validation_pdf(validation_results)
@@ -263,8 +396,10 @@ def export_pdf():
 def export_excel():
     """Export traceability matrix to Excel"""
     try:
-        matrix_data = traceability_matrix.generate_matrix(srs_requirements, test_cases)
-        excel_path = traceability_matrix.export_to_excel(matrix_data)
+        payload = _traceability_payload(tc_version, srs_version)
+        excel_path = traceability_matrix.export_to_excel(
+            payload["matrix"], coverage_stats=payload["coverage_stats"]
+        )
         
         return jsonify({
             "message": "Excel file generated successfully",
@@ -273,21 +408,35 @@ def export_excel():
     except Exception as e:
         return jsonify({"error": f"Excel export failed: {str(e)}"}), 500
 
+@app.route("/debug/cache_stats")
+def cache_stats():
+    """Report hit rates of the in-process caches (debug mode only)"""
+    if not DEBUG:
+        return jsonify({"error": "Not found"}), 404
+    caches = {
+        "extract_requirement_id": _extract_requirement_id,
+        "mapping_payload": _mapping_payload,
+        "traceability_payload": _traceability_payload
+    }
+    stats = {name: func.cache_info()._asdict() for name, func in caches.items()}
+    stats["query_cache"] = {"currsize": len(query_cache), "maxsize": query_cache.max_entries}
+    return jsonify(stats)
+
 @app.route("/download/<filename>")
 def download_file(filename):
     """Download generated files"""
     return send_from_directory("data/exports", filename, as_attachment=True)
 
-def _generate_test_steps(chunk, query):
-    """Generate test steps based on chunk content and query"""
-    # Enhanced rule-based test step generation
-    steps = []
-    query_lower = query.lower()
-    chunk_lower = chunk.lower()
-    
-    # User Registration scenarios
-    if any(keyword in query_lower for keyword in ["registration", "register", "signup", "sign up", "create account"]):
-        steps = [
+def _keyword_re(keywords):
+    """Compile a list of keywords into one substring-matching alternation."""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+# Query keyword categories for test step generation, checked in order
+_TEST_STEP_CATEGORIES = tuple(
+    (_keyword_re(keywords), "\n".join(steps))
+    for keywords, steps in (
+        # User Registration scenarios
+        (["registration", "register", "signup", "sign up", "create account"], (
             "1. Navigate to user registration page",
             "2. Enter valid user information (name, email, password)",
             "3. Click Register button",
@@ -295,22 +444,18 @@ def _generate_test_steps(chunk, query):
             "5. Check email inbox for verification email",
             "6. Click verification link in email",
             "7. Verify account activation"
-        ]
-    
-    # Login scenarios
-    elif any(keyword in query_lower for keyword in ["login", "sign in", "authentication", "signin"]):
-        steps = [
+        )),
+        # Login scenarios
+        (["login", "sign in", "authentication", "signin"], (
             "1. Navigate to login page",
             "2. Enter valid username/email",
             "3. Enter correct password",
             "4. Click login button",
             "5. Verify redirect to dashboard or homepage",
             "6. Check for user session establishment"
-        ]
-    
-    # Password Reset scenarios
-    elif any(keyword in query_lower for keyword in ["password reset", "forgot password", "reset password"]):
-        steps = [
+        )),
+        # Password Reset scenarios
+        (["password reset", "forgot password", "reset password"], (
             "1. Navigate to login page",
             "2. Click 'Forgot Password' link",
             "3. Enter registered email address",
@@ -320,11 +465,9 @@ def _generate_test_steps(chunk, query):
             "7. Enter new password",
             "8. Confirm password change",
             "9. Login with new password"
-        ]
-    
-    # Shopping Cart scenarios
-    elif any(keyword in query_lower for keyword in ["cart", "shopping cart", "add to cart"]):
-        steps = [
+        )),
+        # Shopping Cart scenarios
+        (["cart", "shopping cart", "add to cart"], (
             "1. Browse product catalog",
             "2. Select desired product",
             "3. Choose quantity and options",
@@ -332,11 +475,9 @@ def _generate_test_steps(chunk, query):
             "5. Verify item appears in cart",
             "6. Check quantity and price accuracy",
             "7. Test cart persistence across sessions"
-        ]
-    
-    # Checkout/Payment scenarios
-    elif any(keyword in query_lower for keyword in ["checkout", "payment", "purchase", "buy"]):
-        steps = [
+        )),
+        # Checkout/Payment scenarios
+        (["checkout", "payment", "purchase", "buy"], (
             "1. Add products to shopping cart",
             "2. Proceed to checkout",
             "3. Enter shipping information",
@@ -346,11 +487,9 @@ def _generate_test_steps(chunk, query):
             "7. Review order summary",
             "8. Complete purchase",
             "9. Verify order confirmation"
-        ]
-    
-    # Search functionality
-    elif any(keyword in query_lower for keyword in ["search", "find", "filter"]):
-        steps = [
+        )),
+        # Search functionality
+        (["search", "find", "filter"], (
             "1. Navigate to search interface",
             "2. Enter search keywords",
             "3. Apply relevant filters",
@@ -358,11 +497,9 @@ def _generate_test_steps(chunk, query):
             "5. Review search results",
             "6. Verify result relevance",
             "7. Test result sorting options"
-        ]
-    
-    # Product management
-    elif any(keyword in query_lower for keyword in ["product", "inventory", "catalog"]):
-        steps = [
+        )),
+        # Product management
+        (["product", "inventory", "catalog"], (
             "1. Login as merchant/admin",
             "2. Navigate to product management",
             "3. Click 'Add New Product'",
@@ -371,11 +508,9 @@ def _generate_test_steps(chunk, query):
             "6. Set pricing and inventory",
             "7. Publish product",
             "8. Verify product appears in catalog"
-        ]
-    
-    # Order management
-    elif any(keyword in query_lower for keyword in ["order", "tracking", "fulfillment"]):
-        steps = [
+        )),
+        # Order management
+        (["order", "tracking", "fulfillment"], (
             "1. Access order management system",
             "2. Locate specific order",
             "3. Update order status",
@@ -383,11 +518,9 @@ def _generate_test_steps(chunk, query):
             "5. Send customer notification",
             "6. Verify status update",
             "7. Check customer notification delivery"
-        ]
-    
-    # Validation/Testing scenarios
-    elif any(keyword in query_lower for keyword in ["validate", "validation", "verify", "test"]):
-        steps = [
+        )),
+        # Validation/Testing scenarios
+        (["validate", "validation", "verify", "test"], (
             "1. Prepare test data and environment",
             "2. Execute validation process",
             "3. Input valid test data",
@@ -395,94 +528,167 @@ def _generate_test_steps(chunk, query):
             "5. Input invalid test data",
             "6. Verify error handling",
             "7. Check error messages for clarity"
-        ]
-    
-    # Security/Access Control
-    elif any(keyword in query_lower for keyword in ["security", "access", "permission", "role"]):
-        steps = [
+        )),
+        # Security/Access Control
+        (["security", "access", "permission", "role"], (
             "1. Login with test user account",
             "2. Attempt to access restricted feature",
             "3. Verify access control enforcement",
             "4. Test with different user roles",
             "5. Verify appropriate permissions",
             "6. Check error messages for unauthorized access"
-        ]
-    
-    # Performance testing
-    elif any(keyword in query_lower for keyword in ["performance", "load", "speed", "response time"]):
-        steps = [
+        )),
+        # Performance testing
+        (["performance", "load", "speed", "response time"], (
             "1. Set up performance monitoring",
             "2. Execute performance test scenario",
             "3. Measure response times",
             "4. Monitor system resources",
             "5. Verify performance meets requirements",
             "6. Document performance metrics"
-        ]
-    
-    # Mobile testing
-    elif any(keyword in query_lower for keyword in ["mobile", "responsive", "device"]):
-        steps = [
+        )),
+        # Mobile testing
+        (["mobile", "responsive", "device"], (
             "1. Access application on mobile device",
             "2. Test touch interface functionality",
             "3. Verify responsive design",
             "4. Test navigation on small screen",
             "5. Verify mobile-specific features",
             "6. Check performance on mobile network"
-        ]
-    
+        )),
+    )
+)
+
+# Chunk keyword groups for the generic fallback
+_CHUNK_USER_RE = _keyword_re(["user", "customer", "account"])
+_CHUNK_ADMIN_RE = _keyword_re(["admin", "management", "configure"])
+_CHUNK_DATA_RE = _keyword_re(["input", "enter", "data"])
+_CHUNK_ACTION_RE = _keyword_re(["click", "submit", "save"])
+_CHUNK_VERIFY_RE = _keyword_re(["verify", "check", "validate"])
+
+def _generate_test_steps(chunk, query):
+    """Generate test steps based on chunk content and query"""
+    # Enhanced rule-based test step generation
+    query_lower = query.lower()
+
+    for keyword_re, category_steps in _TEST_STEP_CATEGORIES:
+        if keyword_re.search(query_lower):
+            return category_steps
+
     # Generic fallback with more structure
+    steps = []
+    chunk_lower = chunk.lower()
+
+    # Analyze chunk content for better context
+    if _CHUNK_USER_RE.search(chunk_lower):
+        steps.append("1. Login as test user")
+        steps.append("2. Navigate to relevant feature")
+    elif _CHUNK_ADMIN_RE.search(chunk_lower):
+        steps.append("1. Login as administrator")
+        steps.append("2. Access management interface")
     else:
-        # Analyze chunk content for better context
-        if any(keyword in chunk_lower for keyword in ["user", "customer", "account"]):
-            steps.append("1. Login as test user")
-            steps.append("2. Navigate to relevant feature")
-        elif any(keyword in chunk_lower for keyword in ["admin", "management", "configure"]):
-            steps.append("1. Login as administrator")
-            steps.append("2. Access management interface")
-        else:
-            steps.append("1. Navigate to feature under test")
-        
-        if any(keyword in chunk_lower for keyword in ["input", "enter", "data"]):
-            steps.append(f"{len(steps)+1}. Enter required test data")
-        
-        if any(keyword in chunk_lower for keyword in ["click", "submit", "save"]):
-            steps.append(f"{len(steps)+1}. Execute primary action")
-        
-        if any(keyword in chunk_lower for keyword in ["verify", "check", "validate"]):
-            steps.append(f"{len(steps)+1}. Verify expected results")
-        else:
-            steps.append(f"{len(steps)+1}. Confirm successful operation")
-    
-    return "\n".join(steps) if steps else "1. Execute test scenario\n2. Verify expected results"
+        steps.append("1. Navigate to feature under test")
+
+    if _CHUNK_DATA_RE.search(chunk_lower):
+        steps.append(f"{len(steps)+1}. Enter required test data")
 
+    if _CHUNK_ACTION_RE.search(chunk_lower):
+        steps.append(f"{len(steps)+1}. Execute primary action")
+
+    if _CHUNK_VERIFY_RE.search(chunk_lower):
+        steps.append(f"{len(steps)+1}. Verify expected results")
+    else:
+        steps.append(f"{len(steps)+1}. Confirm successful operation")
+
+    return "\n".join(steps)
+
+def _get_save_folder():
+    """Return today's upload folder, creating it the first time it is needed"""
+    date_folder = datetime.now().strftime("%Y-%m-%d")
+    if _save_folder_cache["date"] != date_folder:
+        save_folder = os.path.join("data", date_folder)
+        os.makedirs(save_folder, exist_ok=True)
+        _save_folder_cache["path"] = save_folder
+        _save_folder_cache["date"] = date_folder
+    return _save_folder_cache["path"]
+
+@lru_cache(maxsize=4096)
 def _extract_requirement_id(chunk):
     """Extract requirement ID from chunk if available"""
-    # Simple pattern matching for requirement IDs
-    import re
-    patterns = [r'REQ[_-]?\d+', r'R\d+', r'FR[_-]?\d+', r'NFR[_-]?\d+']
-    
-    for pattern in patterns:
-        match = re.search(pattern, chunk, re.IGNORECASE)
-        if match:
-            return match.group()
-    
-    return None
+    match = _REQ_ID_RE.search(chunk)
+    return match.group() if match else None
 
-def _clean_test_cases():
-    """Clean up the global test_cases list to ensure all items are valid dictionaries"""
-    global test_cases
-    original_count = len(test_cases)
-    test_cases = [tc for tc in test_cases if isinstance(tc, dict) and tc.get('id')]
-    
-    if len(test_cases) != original_count:
-        print(f"Cleaned test cases: removed {original_count - len(test_cases)} invalid items")
+def _load_cached_document(cache_path):
+    """Return cached chunks and requirements for a document, or None"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        # Pruning drops the least recently used documents first
+        os.utime(cache_path)
+        return cached
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("Ignoring unreadable cache file %s: %s", cache_path, e)
+        return None
+
+def _save_cached_document(cache_path, data):
+    """Write extraction results for reuse by later uploads of the same file"""
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        log.warning("Could not write cache file %s: %s", cache_path, e)
+    _prune_document_cache()
+
+def _prune_document_cache():
+    """Drop cache files of other extraction versions and all but the newest MAX_CACHED_DOCUMENTS"""
+    prefix = f"{EXTRACTION_CACHE_VERSION}-"
+    current = []
+    try:
+        with os.scandir(CACHE_FOLDER) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                if entry.name.startswith(prefix):
+                    current.append((entry.stat().st_mtime, entry.path))
+                else:
+                    _remove_cache_file(entry.path)
+    except FileNotFoundError:
+        return
     
-    return test_cases
+    current.sort(reverse=True)
+    for _, path in current[MAX_CACHED_DOCUMENTS:]:
+        _remove_cache_file(path)
 
-if __name__ == "__main__":
-    # Create necessary directories
+def _remove_cache_file(path):
+    """Delete a cache file; another upload may have pruned it already"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        log.warning("Could not remove cache file %s: %s", path, e)
+
+def _append_test_case(tc):
+    """Store a test case; callers hold state_lock and pass dicts with an ID"""
+    assert isinstance(tc, dict) and tc.get('id'), "test cases must be dicts with an ID"
+    test_cases.append(tc)
+    test_case_ids.add(tc['id'])
+
+def create_directories():
+    """Create the data, export and model directories used by the app"""
     os.makedirs("data", exist_ok=True)
     os.makedirs("data/exports", exist_ok=True)
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
     os.makedirs("models", exist_ok=True)
+
+if __name__ == "__main__":
+    # Create necessary directories
+    create_directories()
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only; use wsgi.py with gunicorn in production
+    app.run(host='0.0.0.0', port=5000, debug=DEBUG)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from app import app
+from app import app, create_directories, DEBUG
 
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_directories()
+    app.run(host='0.0.0.0', port=5000, debug=DEBUG)
\ No newline at end of file
@@ -0,0 +1,35 @@
+import numpy as np
+
+class ChunkStore:
+    """
+    Read-only sequence of text chunks packed into one contiguous buffer.
+
+    All chunks are stored UTF-8 encoded back to back in ``buf``; chunk i
+    spans ``buf[offs[i]:offs[i + 1]]`` and is only decoded when accessed.
+    """
+
+    def __init__(self, chunks):
+        encoded = [chunk.encode('utf-8') for chunk in chunks]
+        self.offs = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(data) for data in encoded], out=self.offs[1:])
+        self.buf = b''.join(encoded)
+
+    def __len__(self):
+        return len(self.offs) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return self._decode(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._decode(i)
+
+    def _decode(self, i):
+        return self.buf[self.offs[i]:self.offs[i + 1]].decode('utf-8')
@@ -5,8 +5,60 @@ This provides rule-based test case generation from requirements.
 
 import re
 import json
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 
+# Split by common requirement indicators
+# Each pattern scans the whole text on its own, so a "shall" statement
+# inside a numbered requirement is extracted by itself as well
+_REQ_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for pattern in (
+        r'(\d+\.\d+[^\d]*?)(?=\d+\.\d+|$)',  # Numbered requirements
+        r'(The system shall[^.]*\.)',        # "Shall" statements
+        r'(The system must[^.]*\.)',         # "Must" statements
+        r'([A-Z][^.]{50,200}\.)',           # General sentences
+    )
+]
+MAX_EXTRACTED_REQUIREMENTS = 10
+_REQ_NUMBER_PREFIX_RE = re.compile(r'^\d+\.\d+\s*')
+
+# Common starting/closing steps and type-specific steps for generated test cases
+_COMMON_START_STEPS = (
+    "1. Launch the application",
+    "2. Navigate to the relevant feature/module"
+)
+_COMMON_END_STEPS = (
+    "6. Document any issues or observations",
+)
+_TYPE_STEPS = {
+    "Security Test": (
+        "3. Attempt to access the feature without proper authentication",
+        "4. Verify security measures are in place",
+        "5. Test with valid credentials"
+    ),
+    "Performance Test": (
+        "3. Initiate the process/function",
+        "4. Measure response time and resource usage",
+        "5. Repeat test under different load conditions"
+    ),
+    "Usability Test": (
+        "3. Perform typical user actions",
+        "4. Evaluate ease of use and user experience",
+        "5. Check for clear error messages and feedback"
+    )
+}
+_DEFAULT_TYPE_STEPS = (
+    "3. Execute the required functionality",
+    "4. Verify the system behavior",
+    "5. Check the output/result"
+)
+_TEST_STEPS = {
+    test_type: _COMMON_START_STEPS + steps + _COMMON_END_STEPS
+    for test_type, steps in _TYPE_STEPS.items()
+}
+_DEFAULT_TEST_STEPS = _COMMON_START_STEPS + _DEFAULT_TYPE_STEPS + _COMMON_END_STEPS
+
 class SimpleDecoder:
     """A simplified decoder for test case generation without ML dependencies."""
     
@@ -55,34 +107,24 @@ class SimpleDecoder:
     
     def _extract_requirements(self, text: str) -> List[str]:
         """Extract individual requirements from text."""
-        # Split by common requirement indicators
-        patterns = [
-            r'(\d+\.\d+[^\d]*?)(?=\d+\.\d+|$)',  # Numbered requirements
-            r'(The system shall[^.]*\.)',        # "Shall" statements
-            r'(The system must[^.]*\.)',         # "Must" statements
-            r'([A-Z][^.]{50,200}\.)',           # General sentences
-        ]
-        
-        requirements = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            requirements.extend([match.strip() for match in matches if len(match.strip()) > 20])
-            
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_requirements = []
-        for req in requirements:
-            if req not in seen:
-                seen.add(req)
-                unique_requirements.append(req)
-                
-        return unique_requirements[:10]  # Limit to 10 requirements
+        # Dict keys dedupe while preserving order; scanning stops once the
+        # limit is reached, since later matches would be cut off anyway
+        requirements = {}
+        for pattern in _REQ_PATTERNS:
+            for match in pattern.finditer(text):
+                req = match.group(1).strip()
+                if len(req) > 20:
+                    requirements[req] = None
+                    if len(requirements) == MAX_EXTRACTED_REQUIREMENTS:
+                        return list(requirements)
+        
+        return list(requirements)
     
     def _generate_single_test_case(self, requirement: str, case_id: int, query: str = "") -> Dict[str, Any]:
         """Generate a single test case from requirement."""
         
         # Clean requirement text
-        clean_req = re.sub(r'^\d+\.\d+\s*', '', requirement)
+        clean_req = _REQ_NUMBER_PREFIX_RE.sub('', requirement)
         clean_req = clean_req.strip()
         
         # Determine test type based on content
@@ -113,7 +155,6 @@ class SimpleDecoder:
     
     def _determine_test_type(self, requirement: str, query: str = "") -> str:
         """Determine appropriate test type based on requirement content."""
-        req_lower = requirement.lower()
         query_lower = query.lower()
         
         # Check query first for specific test type requests
@@ -121,30 +162,11 @@ class SimpleDecoder:
             if test_type.lower() in query_lower:
                 return test_type
         
-        # Determine based on requirement content
-        if any(word in req_lower for word in ['login', 'authentication', 'password', 'security']):
-            return "Security Test"
-        elif any(word in req_lower for word in ['performance', 'speed', 'time', 'response']):
-            return "Performance Test"
-        elif any(word in req_lower for word in ['user', 'interface', 'display', 'screen']):
-            return "Usability Test"
-        elif any(word in req_lower for word in ['integration', 'connect', 'interface', 'api']):
-            return "Integration Test"
-        elif any(word in req_lower for word in ['function', 'calculate', 'process', 'algorithm']):
-            return "Unit Test"
-        else:
-            return "Functional Test"
+        return _test_type_for_requirement(requirement)
     
     def _determine_priority(self, requirement: str) -> str:
         """Determine test priority based on requirement content."""
-        req_lower = requirement.lower()
-        
-        if any(word in req_lower for word in ['critical', 'essential', 'must', 'required']):
-            return "High"
-        elif any(word in req_lower for word in ['should', 'important', 'recommended']):
-            return "Medium"
-        else:
-            return "Low"
+        return _priority_for_requirement(requirement)
     
     def _generate_preconditions(self, requirement: str) -> List[str]:
         """Generate preconditions for the test case."""
@@ -162,41 +184,8 @@ class SimpleDecoder:
     
     def _generate_test_steps(self, requirement: str, test_type: str) -> List[str]:
         """Generate test steps based on requirement and test type."""
-        steps = []
-        req_lower = requirement.lower()
-        
-        # Common starting steps
-        steps.append("1. Launch the application")
-        steps.append("2. Navigate to the relevant feature/module")
-        
-        # Add specific steps based on test type
-        if test_type == "Security Test":
-            steps.extend([
-                "3. Attempt to access the feature without proper authentication",
-                "4. Verify security measures are in place",
-                "5. Test with valid credentials"
-            ])
-        elif test_type == "Performance Test":
-            steps.extend([
-                "3. Initiate the process/function",
-                "4. Measure response time and resource usage",
-                "5. Repeat test under different load conditions"
-            ])
-        elif test_type == "Usability Test":
-            steps.extend([
-                "3. Perform typical user actions",
-                "4. Evaluate ease of use and user experience",
-                "5. Check for clear error messages and feedback"
-            ])
-        else:
-            steps.extend([
-                "3. Execute the required functionality",
-                "4. Verify the system behavior",
-                "5. Check the output/result"
-            ])
-            
-        steps.append("6. Document any issues or observations")
-        return steps
+        # Copy so callers can safely modify the returned list
+        return list(_TEST_STEPS.get(test_type, _DEFAULT_TEST_STEPS))
     
     def _generate_expected_result(self, requirement: str, test_type: str) -> str:
         """Generate expected result for the test case."""
@@ -209,6 +198,36 @@ class SimpleDecoder:
         else:
             return f"System successfully implements the requirement: {requirement[:100]}{'...' if len(requirement) > 100 else ''}"
 
+@lru_cache(maxsize=4096)
+def _test_type_for_requirement(requirement: str) -> str:
+    """Determine test type from requirement content alone (memoized)."""
+    req_lower = requirement.lower()
+    
+    if any(word in req_lower for word in ['login', 'authentication', 'password', 'security']):
+        return "Security Test"
+    elif any(word in req_lower for word in ['performance', 'speed', 'time', 'response']):
+        return "Performance Test"
+    elif any(word in req_lower for word in ['user', 'interface', 'display', 'screen']):
+        return "Usability Test"
+    elif any(word in req_lower for word in ['integration', 'connect', 'interface', 'api']):
+        return "Integration Test"
+    elif any(word in req_lower for word in ['function', 'calculate', 'process', 'algorithm']):
+        return "Unit Test"
+    else:
+        return "Functional Test"
+
+@lru_cache(maxsize=4096)
+def _priority_for_requirement(requirement: str) -> str:
+    """Determine test priority from requirement content (memoized)."""
+    req_lower = requirement.lower()
+    
+    if any(word in req_lower for word in ['critical', 'essential', 'must', 'required']):
+        return "High"
+    elif any(word in req_lower for word in ['should', 'important', 'recommended']):
+        return "Medium"
+    else:
+        return "Low"
+
 def create_decoder(vocab_size=None, embed_dim=None, num_heads=None, num_layers=None):
     """Create a simple decoder (compatibility function)."""
     return SimpleDecoder()
\ No newline at end of file
@@ -5,11 +5,28 @@ This provides a simplified text encoding for test case generation.
 
 import re
 import json
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_WORD_RE = re.compile(r'\b\w+\b')
+# Maps every ASCII non-word character to a space, for splitting ASCII text into words
+_ASCII_WORD_TABLE = str.maketrans({chr(c): ' ' for c in range(128) if not (chr(c).isalnum() or chr(c) == '_')})
+_DIGIT_RE = re.compile(r'\d')
+_TECHNICAL_TERM_RE = re.compile(r'\b(API|URL|HTTP|JSON|XML|database|server|client)\b')
+
+def tokenize_words(text: str) -> List[str]:
+    """Split text into \\w+ words; ASCII text skips the regex engine."""
+    if text.isascii():
+        return text.translate(_ASCII_WORD_TABLE).split()
+    return _WORD_RE.findall(text)
 
 class SimpleEncoder:
     """A simplified encoder for text processing without ML dependencies."""
     
+    _REQUIREMENT_KEYWORDS = frozenset({'shall', 'must', 'should', 'will', 'require', 'need'})
+    _TEST_KEYWORDS = frozenset({'test', 'verify', 'validate', 'check', 'ensure', 'confirm'})
+    
     def __init__(self, max_seq_length=512):
         self.max_seq_length = max_seq_length
         
@@ -25,7 +42,8 @@ class SimpleEncoder:
         """
         # Basic text processing
         sentences = self._split_sentences(text)
-        words = self._extract_words(text)
+        text_lower = text.lower()
+        words = self._extract_words(text, text_lower)
         
         return {
             'text': text,
@@ -33,38 +51,42 @@ class SimpleEncoder:
             'words': words,
             'word_count': len(words),
             'sentence_count': len(sentences),
-            'features': self._extract_features(text)
+            'features': self._extract_features(text, words, text_lower)
         }
     
     def _split_sentences(self, text: str) -> List[str]:
         """Split text into sentences."""
         # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
-    def _extract_words(self, text: str) -> List[str]:
+    def _extract_words(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract words from text."""
-        words = re.findall(r'\b\w+\b', text.lower())
+        if text_lower is None:
+            text_lower = text.lower()
+        words = tokenize_words(text_lower)
         return words[:self.max_seq_length]  # Limit sequence length
     
-    def _extract_features(self, text: str) -> Dict[str, Any]:
-        """Extract basic text features."""
-        words = self._extract_words(text)
+    def _extract_features(self, text: str, words: Optional[List[str]] = None,
+                          text_lower: Optional[str] = None) -> Dict[str, Any]:
+        """Extract basic text features, reusing words/text_lower when the caller has them."""
+        if text_lower is None:
+            text_lower = text.lower()
+        if words is None:
+            words = self._extract_words(text, text_lower)
+        word_counts = Counter(words)
         
         # Count different types of keywords
-        requirement_keywords = ['shall', 'must', 'should', 'will', 'require', 'need']
-        test_keywords = ['test', 'verify', 'validate', 'check', 'ensure', 'confirm']
-        
-        req_count = sum(1 for word in words if word in requirement_keywords)
-        test_count = sum(1 for word in words if word in test_keywords)
+        req_count = sum(word_counts[keyword] for keyword in self._REQUIREMENT_KEYWORDS)
+        test_count = sum(word_counts[keyword] for keyword in self._TEST_KEYWORDS)
         
         return {
             'requirement_indicators': req_count,
             'test_indicators': test_count,
             'avg_word_length': sum(len(w) for w in words) / len(words) if words else 0,
-            'unique_words': len(set(words)),
-            'has_numbers': bool(re.search(r'\d', text)),
-            'has_technical_terms': bool(re.search(r'\b(API|URL|HTTP|JSON|XML|database|server|client)\b', text.lower()))
+            'unique_words': len(word_counts),
+            'has_numbers': bool(_DIGIT_RE.search(text)),
+            'has_technical_terms': bool(_TECHNICAL_TERM_RE.search(text_lower))
         }
 
 def create_encoder(vocab_size=None, embed_dim=None, num_heads=None, num_layers=None):
@@ -1,119 +1,215 @@
 import re
+import bisect
+import hashlib
+import heapq
+import logging
+from collections import defaultdict
+import numpy as np
 from datetime import datetime
-from src.semantic_search import get_similarity_scores
+from src.semantic_search import get_similarity_scores, get_similarity_scores_batch
+from src.encoder import tokenize_words
+
+log = logging.getLogger(__name__)
+
+_PATTERN_FLAGS = re.MULTILINE | re.IGNORECASE
+
+def _compile_patterns(patterns):
+    return {req_type: [re.compile(p, _PATTERN_FLAGS) for p in pattern_list]
+            for req_type, pattern_list in patterns.items()}
+
+# Basic requirement patterns (used by _extract_requirements_from_chunk)
+_REQUIREMENT_PATTERNS = _compile_patterns({
+    'functional': [
+        r'(?i)(?:FR|functional requirement)[_\-\s]*(\d+)',
+        r'(?i)(?:req|requirement)[_\-\s]*(\d+)',
+        r'(?i)the system shall[_\-\s]*(\d+)',
+        r'(?i)function[_\-\s]*(\d+)'
+    ],
+    'non_functional': [
+        r'(?i)(?:NFR|non.?functional requirement)[_\-\s]*(\d+)',
+        r'(?i)(?:performance|security|usability)[_\-\s]*(\d+)',
+        r'(?i)(?:quality)[_\-\s]*(\d+)'
+    ],
+    'user_story': [
+        r'(?i)(?:US|user story)[_\-\s]*(\d+)',
+        r'(?i)as a .* I want .* so that',
+        r'(?i)story[_\-\s]*(\d+)'
+    ]
+})
+
+# Enhanced patterns for better requirement detection. Patterns sharing the
+# "<keyword> <number>" shape are merged into one alternation so a chunk is
+# scanned once per shape; group p<k>/n<k> marks the k-th pattern of the type
+# and its number, so matches can be replayed in the original pattern order.
+# Patterns are written in lowercase: ASCII chunks are lowercased once and
+# scanned without IGNORECASE, anything else uses the case-folding variant.
+_ENHANCED_PATTERN_SOURCES = {
+    'functional': [
+        r'(?P<p0>(?:fr|functional requirement|requirement)[_\-\s]*(?P<n0>\d+\.?\d*))'
+        r'|(?P<p1>(?:req|requirement)[_\-\s]*(?P<n1>\d+\.?\d*))'
+        r'|(?P<p4>function[_\-\s]*(?P<n4>\d+\.?\d*))',
+        r'(?P<p2>the system shall[_\-\s]*(?P<n2>\d+\.?\d*)?)'
+        r'|(?P<p3>the system must[_\-\s]*(?P<n3>\d+\.?\d*)?)'
+    ],
+    'non_functional': [
+        r'(?P<p0>(?:nfr|non.?functional)[_\-\s]*(?P<n0>\d+\.?\d*))'
+        r'|(?P<p1>(?:performance|security|usability)[_\-\s]*(?P<n1>\d+\.?\d*))'
+        r'|(?P<p2>(?:quality|reliability)[_\-\s]*(?P<n2>\d+\.?\d*))'
+    ],
+    'user_story': [
+        r'(?P<p0>(?:us|user story)[_\-\s]*(?P<n0>\d+\.?\d*))'
+        r'|(?P<p2>story[_\-\s]*(?P<n2>\d+\.?\d*))',
+        r'(?P<p1>as a .* i want .* so that)'
+    ]
+}
+_ENHANCED_PATTERNS = {
+    req_type: [re.compile(p, _PATTERN_FLAGS) for p in pattern_list]
+    for req_type, pattern_list in _ENHANCED_PATTERN_SOURCES.items()
+}
+_ENHANCED_PATTERNS_LOWER = {
+    req_type: [re.compile(p, re.MULTILINE) for p in pattern_list]
+    for req_type, pattern_list in _ENHANCED_PATTERN_SOURCES.items()
+}
+
+def _ordered_matches(pattern_list, chunk):
+    """Yield (pattern rank, match) in the order separate per-pattern scans would find them."""
+    matches = [(int(m.lastgroup[1:]), m) for pattern in pattern_list for m in pattern.finditer(chunk)]
+    matches.sort(key=lambda item: (item[0], item[1].start()))
+    return matches
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+def _keyword_re(keywords):
+    """Compile keywords into one alternation matching any of them as a substring."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+# Priority buckets, checked in order
+_PRIORITY_KEYWORD_RES = tuple((_keyword_re(keywords), priority) for priority, keywords in (
+    ('high', ['critical', 'essential', 'must', 'required', 'mandatory', 'shall']),
+    ('medium', ['should', 'important', 'recommended']),
+    ('low', ['may', 'could', 'optional', 'nice to have'])
+))
+
+# Requirement categories, checked in order
+_CATEGORY_KEYWORD_RES = tuple((_keyword_re(keywords), category) for category, keywords in (
+    ('authentication', ['login', 'password', 'authentication', 'credential', 'user access']),
+    ('validation', ['validate', 'validation', 'verify', 'check', 'ensure']),
+    ('interface', ['display', 'show', 'interface', 'ui', 'user interface', 'screen']),
+    ('data', ['data', 'database', 'store', 'save', 'retrieve', 'record']),
+    ('security', ['security', 'secure', 'permission', 'authorization', 'access control']),
+    ('performance', ['performance', 'speed', 'response time', 'load', 'scalability']),
+    ('integration', ['integration', 'api', 'external', 'third party', 'interface'])
+))
+
+def _requirement_sort_key(requirement):
+    return requirement['id']
+
+def _content_key(stripped_content):
+    """Deterministic dedup key for the first 100 characters of a requirement."""
+    return hashlib.blake2b(stripped_content[:100].encode('utf-8', 'ignore'), digest_size=8).digest()
+
+def _join_test_content(test_case):
+    """Join a test case's searchable fields, flattening list values."""
+    test_content_parts = []
+    for field in ('title', 'description', 'steps', 'query'):
+        value = test_case.get(field, '')
+        if isinstance(value, str):
+            test_content_parts.append(value)
+        elif isinstance(value, list):
+            test_content_parts.append(' '.join(str(v) for v in value))
+        else:
+            test_content_parts.append(str(value) if value else '')
+    return " ".join(test_content_parts).strip()
 
 class MappingEngine:
     def __init__(self):
-        self.requirement_patterns = {
-            'functional': [
-                r'(?i)(?:FR|functional requirement)[_\-\s]*(\d+)',
-                r'(?i)(?:req|requirement)[_\-\s]*(\d+)',
-                r'(?i)the system shall[_\-\s]*(\d+)',
-                r'(?i)function[_\-\s]*(\d+)'
-            ],
-            'non_functional': [
-                r'(?i)(?:NFR|non.?functional requirement)[_\-\s]*(\d+)',
-                r'(?i)(?:performance|security|usability)[_\-\s]*(\d+)',
-                r'(?i)(?:quality)[_\-\s]*(\d+)'
-            ],
-            'user_story': [
-                r'(?i)(?:US|user story)[_\-\s]*(\d+)',
-                r'(?i)as a .* I want .* so that',
-                r'(?i)story[_\-\s]*(\d+)'
-            ]
-        }
+        self.requirement_patterns = _REQUIREMENT_PATTERNS
+        self._patterns = _ENHANCED_PATTERNS
+        self._lower_patterns = _ENHANCED_PATTERNS_LOWER
+        self._req_token_cache = (None, None)  # (requirements list, (token counts, postings))
+        self._chunk_req_cache = (None, {})  # (requirements list, {chunk text: requirement or None})
     
     def extract_requirements(self, text_chunks):
         """
         Extract requirements from text chunks with IDs and types.
         """
-        requirements = []
+        per_chunk = []  # each chunk's requirements, sorted by ID
         processed_content = set()  # Track processed content to avoid duplicates
         
-        # Enhanced patterns for better requirement detection
-        enhanced_patterns = {
-            'functional': [
-                r'(?i)(?:FR|functional requirement|requirement)[_\-\s]*(\d+\.?\d*)',
-                r'(?i)(?:REQ|requirement)[_\-\s]*(\d+\.?\d*)',
-                r'(?i)the system shall[_\-\s]*(\d+\.?\d*)?',
-                r'(?i)the system must[_\-\s]*(\d+\.?\d*)?',
-                r'(?i)function[_\-\s]*(\d+\.?\d*)'
-            ],
-            'non_functional': [
-                r'(?i)(?:NFR|non.?functional)[_\-\s]*(\d+\.?\d*)',
-                r'(?i)(?:performance|security|usability)[_\-\s]*(\d+\.?\d*)',
-                r'(?i)(?:quality|reliability)[_\-\s]*(\d+\.?\d*)'
-            ],
-            'user_story': [
-                r'(?i)(?:US|user story)[_\-\s]*(\d+\.?\d*)',
-                r'(?i)as a .* I want .* so that',
-                r'(?i)story[_\-\s]*(\d+\.?\d*)'
-            ]
-        }
-        
         for chunk_idx, chunk in enumerate(text_chunks):
             # Skip very short chunks
             if len(chunk.strip()) < 50:
                 continue
                 
-            # Extract requirement IDs and types with enhanced patterns
-            extracted_reqs = self._extract_requirements_from_chunk_enhanced(
-                chunk, chunk_idx, enhanced_patterns, processed_content
-            )
-            requirements.extend(extracted_reqs)
-        
-        # Sort by requirement ID for better organization
-        requirements.sort(key=lambda x: x['id'])
-        
-        return requirements
+            # Extract requirement IDs and types with enhanced patterns; lowercasing
+            # ASCII keeps offsets aligned with the original chunk
+            if chunk.isascii():
+                extracted_reqs = self._extract_requirements_from_chunk_enhanced(
+                    chunk, chunk_idx, self._lower_patterns, processed_content, chunk.lower()
+                )
+            else:
+                extracted_reqs = self._extract_requirements_from_chunk_enhanced(
+                    chunk, chunk_idx, self._patterns, processed_content
+                )
+            per_chunk.append(sorted(extracted_reqs, key=_requirement_sort_key))
+        
+        # Merge the per-chunk runs by requirement ID for better organization;
+        # ties keep chunk order, as a stable sort of the concatenation would
+        return list(heapq.merge(*per_chunk, key=_requirement_sort_key))
     
-    def _extract_requirements_from_chunk_enhanced(self, chunk, chunk_idx, patterns, processed_content):
+    def _extract_requirements_from_chunk_enhanced(self, chunk, chunk_idx, patterns, processed_content, scan_text=None):
         """
         Enhanced requirement extraction with better pattern matching.
+        Patterns run over scan_text (defaults to the chunk) while content is
+        taken from the chunk itself. Requirements are yielded as found.
         """
-        requirements = []
+        if scan_text is None:
+            scan_text = chunk
+        found = 0
+        sentence_bounds = self._split_sentence_bounds(chunk)  # shared by every match in the chunk
         
         # Try enhanced requirement patterns
         for req_type, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                matches = re.finditer(pattern, chunk, re.MULTILINE | re.IGNORECASE)
+            for rank, match in _ordered_matches(pattern_list, scan_text):
+                # Extract requirement ID
+                req_id = None
+                number = match.groupdict().get(f"n{rank}")
+                if number:
+                    req_id = f"{req_type.upper()}_{number}"
+                else:
+                    req_id = f"{req_type.upper()}_{chunk_idx}_{found}"
                 
-                for match in matches:
-                    # Extract requirement ID
-                    req_id = None
-                    if match.groups() and match.group(1):
-                        req_id = f"{req_type.upper()}_{match.group(1)}"
-                    else:
-                        req_id = f"{req_type.upper()}_{chunk_idx}_{len(requirements)}"
-                    
-                    # Extract content with better context
-                    content = self._extract_requirement_content_enhanced(chunk, match.start(), match.end())
-                    
-                    # Skip if already processed
-                    content_hash = hash(content.strip()[:100]) if content.strip() else hash("")
-                    if content_hash in processed_content:
-                        continue
-                    processed_content.add(content_hash)
-                    
-                    requirements.append({
-                        'id': req_id,
-                        'type': req_type,
-                        'content': content.strip(),
-                        'chunk_index': chunk_idx,
-                        'priority': self._determine_priority(content),
-                        'category': self._categorize_requirement(content),
-                        'validation_status': 'pending'
-                    })
+                # Extract content with better context
+                content = self._extract_requirement_content_enhanced(chunk, match.start(), match.end(), sentence_bounds)
+                
+                # Skip if already processed
+                content = content.strip()
+                content_hash = _content_key(content)
+                if content_hash in processed_content:
+                    continue
+                processed_content.add(content_hash)
+                
+                content_lower = content.lower()
+                found += 1
+                yield {
+                    'id': req_id,
+                    'type': req_type,
+                    'content': content,
+                    'chunk_index': chunk_idx,
+                    'priority': self._determine_priority(content, content_lower),
+                    'category': self._categorize_requirement(content, content_lower),
+                    'validation_status': 'pending'
+                }
         
         # If no specific patterns found, create generic requirements
-        if not requirements:
+        if not found:
             sentences = self._split_into_sentences(chunk)
             for i, sentence in enumerate(sentences):
                 if len(sentence.strip()) > 60:  # Only meaningful sentences
-                    content_hash = hash(sentence.strip()[:100]) if sentence.strip() else hash("")
+                    content_hash = _content_key(sentence.strip())
                     if content_hash not in processed_content:
                         processed_content.add(content_hash)
-                        requirements.append({
+                        yield {
                             'id': f'REQ_{chunk_idx}_{i}',
                             'type': 'general',
                             'content': sentence.strip(),
@@ -121,33 +217,38 @@ class MappingEngine:
                             'priority': 'medium',
                             'category': 'general',
                             'validation_status': 'pending'
-                        })
-        
-        return requirements
+                        }
     
-    def _extract_requirement_content_enhanced(self, text, start, end):
+    def _split_sentence_bounds(self, text):
+        """
+        Split text into sentences along with the offset at which each one is
+        assumed to start (every delimiter run counts as one character).
+        """
+        sentences = _SENTENCE_SPLIT_RE.split(text)
+        offsets = [0]
+        for sentence in sentences:
+            offsets.append(offsets[-1] + len(sentence) + 1)  # +1 for delimiter
+        return sentences, offsets
+    
+    def _extract_requirement_content_enhanced(self, text, start, end, sentence_bounds=None):
         """
         Extract better context around requirement matches.
         """
         # Find sentence boundaries with better logic
-        sentences = re.split(r'[.!?]+', text)
-        target_pos = start
-        
-        # Find which sentence contains the match
-        current_pos = 0
-        for i, sentence in enumerate(sentences):
-            sentence_len = len(sentence) + 1  # +1 for delimiter
-            if current_pos <= target_pos <= current_pos + sentence_len:
-                # Include neighboring sentences for context
-                context_sentences = []
-                if i > 0:
-                    context_sentences.append(sentences[i-1].strip())
-                context_sentences.append(sentence.strip())
-                if i < len(sentences) - 1:
-                    context_sentences.append(sentences[i+1].strip())
-                
-                return '. '.join(context_sentences)
-            current_pos += sentence_len
+        sentences, offsets = sentence_bounds or self._split_sentence_bounds(text)
+        
+        # Find the first sentence whose span contains the match start
+        i = bisect.bisect_left(offsets, start, 1) - 1
+        if i < len(sentences):
+            # Include neighboring sentences for context
+            context_sentences = []
+            if i > 0:
+                context_sentences.append(sentences[i-1].strip())
+            context_sentences.append(sentences[i].strip())
+            if i < len(sentences) - 1:
+                context_sentences.append(sentences[i+1].strip())
+            
+            return '. '.join(context_sentences)
         
         # Fallback: return expanded context
         context_start = max(0, start - 150)
@@ -159,11 +260,16 @@ class MappingEngine:
         Extract individual requirements from a text chunk.
         """
         requirements = []
+        # Split on periods once; offsets[i] is where sentence i starts in the chunk
+        sentences = chunk.split('.')
+        offsets = [0]
+        for sentence in sentences:
+            offsets.append(offsets[-1] + len(sentence) + 1)
         
         # Try to match requirement patterns
         for req_type, patterns in self.requirement_patterns.items():
             for pattern in patterns:
-                matches = re.finditer(pattern, chunk, re.MULTILINE | re.IGNORECASE)
+                matches = pattern.finditer(chunk)
                 
                 for match in matches:
                     req_id = None
@@ -174,15 +280,16 @@ class MappingEngine:
                         req_id = f"{req_type.upper()}_{chunk_idx}_{len(requirements)}"
                     
                     # Extract the full sentence or paragraph containing the requirement
-                    content = self._extract_requirement_content(chunk, match.start(), match.end())
+                    content = self._extract_requirement_content(chunk, match.start(), match.end(), (sentences, offsets))
+                    content_lower = content.lower()
                     
                     requirements.append({
                         'id': req_id,
                         'type': req_type,
                         'content': content.strip(),
                         'chunk_index': chunk_idx,
-                        'priority': self._determine_priority(content),
-                        'category': self._categorize_requirement(content)
+                        'priority': self._determine_priority(content, content_lower),
+                        'category': self._categorize_requirement(content, content_lower)
                     })
         
         # If no specific patterns found, create generic requirements from sentences
@@ -201,20 +308,23 @@ class MappingEngine:
         
         return requirements
     
-    def _extract_requirement_content(self, text, start, end):
+    def _extract_requirement_content(self, text, start, end, sentence_bounds=None):
         """
         Extract the full context around a requirement match.
         """
         # Find sentence boundaries
-        sentences = text.split('.')
-        target_pos = start
+        if sentence_bounds is None:
+            sentences = text.split('.')
+            offsets = [0]
+            for sentence in sentences:
+                offsets.append(offsets[-1] + len(sentence) + 1)
+        else:
+            sentences, offsets = sentence_bounds
         
         # Find which sentence contains the match
-        current_pos = 0
-        for sentence in sentences:
-            if current_pos <= target_pos <= current_pos + len(sentence):
-                return sentence.strip()
-            current_pos += len(sentence) + 1
+        i = bisect.bisect_right(offsets, start) - 1
+        if 0 <= i < len(sentences):
+            return sentences[i].strip()
         
         # Fallback: return the match with some context
         context_start = max(0, start - 100)
@@ -226,46 +336,30 @@ class MappingEngine:
         Split text into sentences.
         """
         # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
-    def _determine_priority(self, content):
+    def _determine_priority(self, content, content_lower=None):
         """
         Determine requirement priority based on content keywords.
         """
-        content_lower = content.lower()
-        
-        high_priority_keywords = ['critical', 'essential', 'must', 'required', 'mandatory', 'shall']
-        medium_priority_keywords = ['should', 'important', 'recommended']
-        low_priority_keywords = ['may', 'could', 'optional', 'nice to have']
+        if content_lower is None:
+            content_lower = content.lower()
         
-        if any(keyword in content_lower for keyword in high_priority_keywords):
-            return 'high'
-        elif any(keyword in content_lower for keyword in medium_priority_keywords):
-            return 'medium'
-        elif any(keyword in content_lower for keyword in low_priority_keywords):
-            return 'low'
-        else:
-            return 'medium'  # Default
+        for keyword_re, priority in _PRIORITY_KEYWORD_RES:
+            if keyword_re.search(content_lower):
+                return priority
+        return 'medium'  # Default
     
-    def _categorize_requirement(self, content):
+    def _categorize_requirement(self, content, content_lower=None):
         """
         Categorize requirement based on content.
         """
-        content_lower = content.lower()
-        
-        categories = {
-            'authentication': ['login', 'password', 'authentication', 'credential', 'user access'],
-            'validation': ['validate', 'validation', 'verify', 'check', 'ensure'],
-            'interface': ['display', 'show', 'interface', 'ui', 'user interface', 'screen'],
-            'data': ['data', 'database', 'store', 'save', 'retrieve', 'record'],
-            'security': ['security', 'secure', 'permission', 'authorization', 'access control'],
-            'performance': ['performance', 'speed', 'response time', 'load', 'scalability'],
-            'integration': ['integration', 'api', 'external', 'third party', 'interface']
-        }
+        if content_lower is None:
+            content_lower = content.lower()
         
-        for category, keywords in categories.items():
-            if any(keyword in content_lower for keyword in keywords):
+        for keyword_re, category in _CATEGORY_KEYWORD_RES:
+            if keyword_re.search(content_lower):
                 return category
         
         return 'general'
@@ -282,8 +376,22 @@ class MappingEngine:
         
         valid_test_cases = [tc for tc in test_cases if isinstance(tc, dict)]
         
-        for test_case in valid_test_cases:
-            mapped_requirements = self._find_matching_requirements(test_case, requirements)
+        test_contents = [_join_test_content(tc) for tc in valid_test_cases]
+        
+        # Score every test case against the index in one batch
+        batch_results = [None] * len(valid_test_cases)
+        if requirements:
+            pending = [i for i, content in enumerate(test_contents) if content]
+            scores = get_similarity_scores_batch([test_contents[i] for i in pending], top_k=len(requirements))
+            for i, results in zip(pending, scores):
+                batch_results[i] = results
+        
+        mapping_date = datetime.now().isoformat()  # one timestamp for the whole pass
+        for test_case, test_content, similarity_results in zip(valid_test_cases, test_contents, batch_results):
+            mapped_requirements = self._find_matching_requirements(
+                test_case, requirements, test_content=test_content,
+                similarity_results=similarity_results
+            )
             
             mapping_result = {
                 'test_case_id': test_case.get('id'),
@@ -291,32 +399,23 @@ class MappingEngine:
                 'mapped_requirements': mapped_requirements,
                 'mapping_confidence': self._calculate_mapping_confidence(test_case, mapped_requirements, requirements),
                 'mapping_method': 'semantic_similarity',
-                'mapping_date': datetime.now().isoformat()
+                'mapping_date': mapping_date
             }
             
             mapping_results.append(mapping_result)
         
         return mapping_results
     
-    def _find_matching_requirements(self, test_case, requirements, threshold=0.3):
+    def _find_matching_requirements(self, test_case, requirements, threshold=0.3, test_content=None,
+                                    similarity_results=None):
         """
         Find requirements that match a test case using semantic similarity.
         """
         if not requirements or not isinstance(test_case, dict):
             return []
         
-        # Safely extract test case content
-        test_content_parts = []
-        for field in ['title', 'description', 'steps', 'query']:
-            value = test_case.get(field, '')
-            if isinstance(value, str):
-                test_content_parts.append(value)
-            elif isinstance(value, list):
-                test_content_parts.append(' '.join(str(v) for v in value))
-            else:
-                test_content_parts.append(str(value) if value else '')
-        
-        test_content = " ".join(test_content_parts).strip()
+        if test_content is None:
+            test_content = _join_test_content(test_case)
         
         if not test_content:
             return []
@@ -326,26 +425,24 @@ class MappingEngine:
         # Use semantic search if available
         try:
             # Get similarity scores for requirement contents
-            req_contents = [req['content'] for req in requirements]
-            similarity_results = get_similarity_scores(test_content, top_k=len(req_contents))
+            if similarity_results is None:
+                similarity_results = get_similarity_scores(test_content, top_k=len(requirements))
             
             for i, sim_result in enumerate(similarity_results):
                 if sim_result['similarity'] > threshold:
                     # Find the corresponding requirement
-                    chunk_content = sim_result['chunk']
-                    for req in requirements:
-                        if req['content'] in chunk_content or chunk_content in req['content']:
-                            matched_requirements.append({
-                                'requirement_id': req['id'],
-                                'similarity_score': sim_result['similarity'],
-                                'content': req['content'][:200] + "..." if len(req['content']) > 200 else req['content']
-                            })
-                            break
+                    req = self._requirement_for_chunk(sim_result['chunk'], requirements)
+                    if req is not None:
+                        matched_requirements.append({
+                            'requirement_id': req['id'],
+                            'similarity_score': sim_result['similarity'],
+                            'content': req['content'][:200] + "..." if len(req['content']) > 200 else req['content']
+                        })
         
         except Exception as e:
-            print(f"Semantic matching failed, using keyword matching: {e}")
+            log.warning("Semantic matching failed, using keyword matching: %s", e)
             # Fallback to keyword-based matching
-            matched_requirements = self._keyword_based_matching(test_case, requirements, threshold)
+            matched_requirements = self._keyword_based_matching(test_case, requirements, threshold, test_content)
         
         # Remove duplicates and sort by similarity
         unique_matches = {}
@@ -360,39 +457,77 @@ class MappingEngine:
         # Return top 3 matches
         return sorted_matches[:3]
     
-    def _keyword_based_matching(self, test_case, requirements, threshold=0.3):
+    def _keyword_based_matching(self, test_case, requirements, threshold=0.3, test_content=None):
         """
         Fallback keyword-based matching for requirements.
         """
-        test_content = " ".join([
-            test_case.get('title', ''),
-            test_case.get('description', ''),
-            test_case.get('steps', ''),
-            test_case.get('query', '')
-        ]).lower()
+        if test_content is None:
+            test_content = _join_test_content(test_case)
         
-        test_keywords = set(re.findall(r'\b\w+\b', test_content))
-        matched_requirements = []
+        test_keywords = set(tokenize_words(test_content.lower()))
+        req_counts, postings = self._prepare_requirement_tokens(requirements)
         
-        for req in requirements:
-            req_keywords = set(re.findall(r'\b\w+\b', req['content'].lower()))
-            
-            # Calculate Jaccard similarity
-            intersection = test_keywords.intersection(req_keywords)
-            union = test_keywords.union(req_keywords)
-            
-            if union:
-                similarity = len(intersection) / len(union)
-                
-                if similarity > threshold:
-                    matched_requirements.append({
-                        'requirement_id': req['id'],
-                        'similarity_score': similarity,
-                        'content': req['content'][:200] + "..." if len(req['content']) > 200 else req['content']
-                    })
+        # Intersection sizes for every requirement at once, from the posting
+        # lists of the tokens this test case shares with them
+        shared = [postings[token] for token in test_keywords if token in postings]
+        if shared:
+            intersections = np.bincount(np.concatenate(shared), minlength=len(req_counts))
+        else:
+            intersections = np.zeros(len(req_counts), dtype=np.int64)
+        unions = len(test_keywords) + req_counts - intersections
+        
+        # Calculate Jaccard similarity
+        similarities = np.divide(intersections, unions, out=np.zeros(len(req_counts)), where=unions > 0)
+        matched_requirements = []
+        for i in np.flatnonzero((unions > 0) & (similarities > threshold)):
+            req = requirements[i]
+            matched_requirements.append({
+                'requirement_id': req['id'],
+                'similarity_score': float(similarities[i]),
+                'content': req['content'][:200] + "..." if len(req['content']) > 200 else req['content']
+            })
         
         return matched_requirements
     
+    def _requirement_for_chunk(self, chunk_content, requirements):
+        """
+        Return the first requirement contained in (or containing) a chunk.
+        Results are memoized per requirements list, since the same indexed
+        chunks come back for many test cases.
+        """
+        cached_requirements, by_chunk = self._chunk_req_cache
+        if cached_requirements is not requirements:
+            by_chunk = {}
+            self._chunk_req_cache = (requirements, by_chunk)
+        
+        if chunk_content not in by_chunk:
+            by_chunk[chunk_content] = next(
+                (req for req in requirements
+                 if req['content'] in chunk_content or chunk_content in req['content']),
+                None
+            )
+        return by_chunk[chunk_content]
+    
+    def _prepare_requirement_tokens(self, requirements):
+        """
+        Tokenize requirement contents once per requirements list, returning
+        each requirement's token count and a token -> requirement index map.
+        """
+        cached_requirements, prepared = self._req_token_cache
+        if cached_requirements is requirements and len(prepared[0]) == len(requirements):
+            return prepared
+        
+        req_counts = np.zeros(len(requirements), dtype=np.int64)
+        postings = defaultdict(list)
+        for i, req in enumerate(requirements):
+            tokens = set(tokenize_words(req['content'].lower()))
+            req_counts[i] = len(tokens)
+            for token in tokens:
+                postings[token].append(i)
+        prepared = (req_counts, {token: np.array(ids, dtype=np.int64) for token, ids in postings.items()})
+        self._req_token_cache = (requirements, prepared)
+        return prepared
+    
     def _calculate_mapping_confidence(self, test_case, mapped_requirements, all_requirements):
         """
         Calculate confidence score for the mapping.
@@ -428,17 +563,17 @@ class MappingEngine:
         
         total_requirements = len(requirements)
         covered_count = len(covered_requirements)
-        uncovered_requirements = [req for req in requirements if req['id'] not in covered_requirements]
         
-        coverage_by_category = {}
+        # Collect uncovered requirements and per-category counts in a single pass
+        uncovered_requirements = []
+        coverage_by_category = defaultdict(lambda: {'total': 0, 'covered': 0})
         for req in requirements:
-            category = req.get('category', 'general')
-            if category not in coverage_by_category:
-                coverage_by_category[category] = {'total': 0, 'covered': 0}
-            
-            coverage_by_category[category]['total'] += 1
+            category_counts = coverage_by_category[req.get('category', 'general')]
+            category_counts['total'] += 1
             if req['id'] in covered_requirements:
-                coverage_by_category[category]['covered'] += 1
+                category_counts['covered'] += 1
+            else:
+                uncovered_requirements.append(req)
         
         return {
             'total_requirements': total_requirements,
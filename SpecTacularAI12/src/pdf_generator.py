@@ -1,5 +1,9 @@
 import os
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -7,10 +11,65 @@ from reportlab.lib.colors import HexColor, black, white, red, green, orange
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
+# Write buffer for exported PDFs
+PDF_WRITE_BUFFER_SIZE = 128 * 1024
+
+# Flowables pulled ahead of layout when a story is streamed from an iterator
+STORY_LOOKAHEAD = 64
+
+# Reports rendered by generate_all, in the order their paths are returned
+EXPORT_REPORTS = ('generate_test_cases_pdf', 'generate_validation_pdf', 'generate_traceability_pdf')
+
+# Exports run on server threads, and forking a threaded process can leave a
+# lock held in the child; report workers come from a fork server instead,
+# or are spawned where there is none
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+@lru_cache(maxsize=4096)
+def _parsed_paragraph(text, style):
+    """
+    Parse a paragraph once per (text, style); repeated report lines reuse the result.
+    """
+    return Paragraph(text, style)
+
+def _render_report(method_name, data):
+    """
+    Render one report with a fresh generator (process pool worker).
+    """
+    return getattr(PDFGenerator(), method_name)(data)
+
+class _StreamingDocTemplate(SimpleDocTemplate):
+    """
+    SimpleDocTemplate whose build() accepts any iterable of flowables and
+    pulls them in as layout proceeds, so only STORY_LOOKAHEAD of them are
+    alive at a time.
+    """
+    
+    def build(self, flowables, *args, **kwargs):
+        self._pending = iter(flowables)
+        self._story = []
+        self._top_up()
+        SimpleDocTemplate.build(self, self._story, *args, **kwargs)
+    
+    def _top_up(self):
+        story = self._story
+        for flowable in self._pending:
+            story.append(flowable)
+            if len(story) >= STORY_LOOKAHEAD:
+                break
+    
+    def handle_flowable(self, flowables):
+        if flowables is self._story:
+            self._top_up()
+        SimpleDocTemplate.handle_flowable(self, flowables)
+
 class PDFGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self._setup_table_styles()
     
     def _setup_custom_styles(self):
         """
@@ -56,101 +115,178 @@ class PDFGenerator:
             leftIndent=0.5*inch
         ))
     
-    def generate_test_cases_pdf(self, test_cases, filename=None):
+    def _setup_table_styles(self):
         """
-        Generate PDF document with test cases.
+        Setup the table styles shared by every table of a kind.
         """
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'test_cases_{timestamp}.pdf'
+        # Test case details
+        self.tc_detail_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cccccc')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f8f9fa'))
+        ])
         
-        filepath = os.path.join('data', 'exports', filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # Validation summary
+        self.summary_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, black),
+            ('BACKGROUND', (0, 0), (0, -1), HexColor('#e3f2fd'))
+        ])
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch)
-        story = []
+        # Traceability coverage overview
+        self.coverage_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#366092')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, black)
+        ])
         
+        # Traceability requirements table, before per-row status colors
+        self.requirements_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#366092')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+        ])
+    
+    def _p(self, text, style_name):
+        """
+        Return a Paragraph for a short, frequently repeated string. Each call
+        gets its own copy, so layout state is never shared between flowables.
+        """
+        return copy.copy(_parsed_paragraph(text, self.styles[style_name]))
+    
+    def _build_document(self, story, filepath, output_stream=None):
+        """
+        Render a story (a list or an iterator of flowables) into output_stream
+        when given, otherwise into filepath through a buffered file. Returns
+        the stream or the path.
+        """
+        target = output_stream
+        if target is None:
+            target = open(filepath, 'wb', buffering=PDF_WRITE_BUFFER_SIZE)
+        try:
+            doc = _StreamingDocTemplate(target, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch)
+            doc.build(story)
+        finally:
+            if output_stream is None:
+                target.close()
+        return filepath if output_stream is None else output_stream
+    
+    def generate_test_cases_pdf(self, test_cases, filename=None, output_stream=None):
+        """
+        Generate PDF document with test cases. Writes to output_stream when
+        given (returning it), otherwise to data/exports (returning the path).
+        """
+        filepath = None
+        if output_stream is None:
+            if not filename:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f'test_cases_{timestamp}.pdf'
+            
+            filepath = os.path.join('data', 'exports', filename)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        
+        story = self._test_cases_story(test_cases)
+        
+        return self._build_document(story, filepath, output_stream)
+    
+    def _test_cases_story(self, test_cases):
+        """
+        Yield the test case report's flowables one test case at a time.
+        """
         # Title
-        story.append(Paragraph("SmartSpec AI - Generated Test Cases", self.styles['CustomTitle']))
-        story.append(Spacer(1, 20))
+        yield Paragraph("SmartSpec AI - Generated Test Cases", self.styles['CustomTitle'])
+        yield Spacer(1, 20)
         
         # Metadata
-        story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
-                              self.styles['Normal']))
-        story.append(Paragraph(f"Total Test Cases: {len(test_cases)}", self.styles['Normal']))
-        story.append(Spacer(1, 30))
+        yield Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
+                        self.styles['Normal'])
+        yield Paragraph(f"Total Test Cases: {len(test_cases)}", self.styles['Normal'])
+        yield Spacer(1, 30)
         
         # Test cases
         for i, tc in enumerate(test_cases, 1):
-            # Test case header
-            story.append(Paragraph(f"Test Case {i}: {tc.get('title', 'Untitled')}", 
-                                 self.styles['TestCaseTitle']))
-            
-            # Test case details table
-            data = []
-            
-            # Basic info
-            data.append(['ID:', tc.get('id', 'N/A')])
-            data.append(['Type:', tc.get('type', 'Functional')])
-            data.append(['Priority:', tc.get('priority', 'Medium')])
-            data.append(['Status:', tc.get('status', 'Generated')])
-            
-            if tc.get('requirement_id'):
-                data.append(['Requirement ID:', tc.get('requirement_id')])
-            
-            # Description
-            if tc.get('description'):
-                data.append(['Description:', tc.get('description')])
-            
-            # Create table
-            table = Table(data, colWidths=[1.5*inch, 4*inch])
-            table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cccccc')),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('BACKGROUND', (0, 0), (0, -1), HexColor('#f8f9fa'))
-            ]))
-            
-            story.append(table)
-            story.append(Spacer(1, 10))
-            
-            # Test steps
-            if tc.get('steps'):
-                story.append(Paragraph("<b>Test Steps:</b>", self.styles['TestCaseContent']))
-                steps_text = tc.get('steps', '').replace('\n', '<br/>')
-                story.append(Paragraph(steps_text, self.styles['TestCaseContent']))
-                story.append(Spacer(1, 10))
-            
-            # Expected result
-            if tc.get('expected'):
-                story.append(Paragraph("<b>Expected Result:</b>", self.styles['TestCaseContent']))
-                story.append(Paragraph(tc.get('expected', ''), self.styles['TestCaseContent']))
-            
-            # Add some space between test cases
-            story.append(Spacer(1, 20))
+            yield from self._tc_flowables(tc, i)
             
             # Page break every 3 test cases
             if i % 3 == 0 and i < len(test_cases):
-                story.append(PageBreak())
-        
-        doc.build(story)
-        return filepath
+                yield PageBreak()
     
-    def generate_validation_pdf(self, validation_results, filename=None):
+    def _tc_flowables(self, tc, i):
+        """
+        Yield the flowables for test case number i. The layout is the same for
+        every test case, so only the per-case values are looked up here.
+        """
+        content_style = self.styles['TestCaseContent']
+        requirement_id = tc.get('requirement_id')
+        description = tc.get('description')
+        steps = tc.get('steps')
+        expected = tc.get('expected')
+        
+        # Test case header
+        yield Paragraph(f"Test Case {i}: {tc.get('title', 'Untitled')}", 
+                        self.styles['TestCaseTitle'])
+        
+        # Test case details table: basic info, then the optional rows
+        data = [
+            ['ID:', tc.get('id', 'N/A')],
+            ['Type:', tc.get('type', 'Functional')],
+            ['Priority:', tc.get('priority', 'Medium')],
+            ['Status:', tc.get('status', 'Generated')]
+        ]
+        if requirement_id:
+            data.append(['Requirement ID:', requirement_id])
+        if description:
+            data.append(['Description:', description])
+        
+        # Create table
+        table = Table(data, colWidths=[1.5*inch, 4*inch])
+        table.setStyle(self.tc_detail_style)
+        
+        yield table
+        yield Spacer(1, 10)
+        
+        # Test steps
+        if steps:
+            yield self._p("<b>Test Steps:</b>", 'TestCaseContent')
+            yield Paragraph(steps.replace('\n', '<br/>'), content_style)
+            yield Spacer(1, 10)
+        
+        # Expected result
+        if expected:
+            yield self._p("<b>Expected Result:</b>", 'TestCaseContent')
+            yield Paragraph(expected, content_style)
+        
+        # Add some space between test cases. Spacers are not shared between
+        # test cases: ReportLab marks a flowable it had to defer as
+        # _postponed and raises LayoutError if that one is deferred again
+        yield Spacer(1, 20)
+    
+    def generate_validation_pdf(self, validation_results, filename=None, output_stream=None):
         """
         Generate PDF with validation results.
         """
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'validation_report_{timestamp}.pdf'
-        
-        filepath = os.path.join('data', 'exports', filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = None
+        if output_stream is None:
+            if not filename:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f'validation_report_{timestamp}.pdf'
+            
+            filepath = os.path.join('data', 'exports', filename)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch)
         story = []
         
         # Title
@@ -173,13 +309,7 @@ class PDFGenerator:
         ]
         
         summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('BACKGROUND', (0, 0), (0, -1), HexColor('#e3f2fd'))
-        ]))
+        summary_table.setStyle(self.summary_style)
         
         story.append(summary_table)
         story.append(Spacer(1, 30))
@@ -202,35 +332,37 @@ class PDFGenerator:
             
             # Errors
             if result['errors']:
-                story.append(Paragraph("<b>Errors:</b>", self.styles['TestCaseContent']))
+                story.append(self._p("<b>Errors:</b>", 'TestCaseContent'))
                 for error in result['errors']:
-                    story.append(Paragraph(f"• {error}", self.styles['TestCaseContent']))
+                    story.append(self._p(f"• {error}", 'TestCaseContent'))
                 story.append(Spacer(1, 5))
             
             # Warnings
             if result['warnings']:
-                story.append(Paragraph("<b>Warnings:</b>", self.styles['TestCaseContent']))
+                story.append(self._p("<b>Warnings:</b>", 'TestCaseContent'))
                 for warning in result['warnings']:
-                    story.append(Paragraph(f"• {warning}", self.styles['TestCaseContent']))
+                    story.append(self._p(f"• {warning}", 'TestCaseContent'))
                 story.append(Spacer(1, 5))
             
             story.append(Spacer(1, 15))
         
-        doc.build(story)
-        return filepath
+        return self._build_document(story, filepath, output_stream)
     
-    def generate_traceability_pdf(self, matrix_data, filename=None):
+    def generate_traceability_pdf(self, matrix_data, filename=None, output_stream=None, coverage_stats=None):
         """
         Generate PDF with traceability matrix.
+        coverage_stats, if given, must be the matrix's calculate_coverage_stats()
+        result; it is computed here otherwise.
         """
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'traceability_matrix_{timestamp}.pdf'
-        
-        filepath = os.path.join('data', 'exports', filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = None
+        if output_stream is None:
+            if not filename:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f'traceability_matrix_{timestamp}.pdf'
+            
+            filepath = os.path.join('data', 'exports', filename)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch)
         story = []
         
         # Title
@@ -238,9 +370,9 @@ class PDFGenerator:
         story.append(Spacer(1, 20))
         
         # Coverage statistics
-        from src.traceability_matrix import TraceabilityMatrix
-        tm = TraceabilityMatrix()
-        coverage_stats = tm.calculate_coverage_stats(matrix_data)
+        if coverage_stats is None:
+            from src.traceability_matrix import TraceabilityMatrix
+            coverage_stats = TraceabilityMatrix().calculate_coverage_stats(matrix_data)
         
         story.append(Paragraph("Coverage Overview", self.styles['CustomSubtitle']))
         
@@ -254,14 +386,7 @@ class PDFGenerator:
         ]
         
         coverage_table = Table(coverage_data, colWidths=[2.5*inch, 1.5*inch])
-        coverage_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#366092')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, black)
-        ]))
+        coverage_table.setStyle(self.coverage_style)
         
         story.append(coverage_table)
         story.append(Spacer(1, 30))
@@ -272,34 +397,23 @@ class PDFGenerator:
         
         req_data = [['Requirement ID', 'Type', 'Priority', 'Covered', 'Test Cases']]
         
-        for req in matrix_data['requirements']:
-            status = "Yes" if req['covered'] else "No"
+        # Rows and their color-coded coverage status, in one pass
+        status_cmds = []
+        covered_color = HexColor('#90EE90')
+        uncovered_color = HexColor('#FFB6C1')
+        for row_idx, req in enumerate(matrix_data['requirements'], 1):
+            covered = req['covered']
             req_data.append([
                 req['id'],
                 req['type'],
                 req['priority'],
-                status,
+                "Yes" if covered else "No",
                 str(req['test_case_count'])
             ])
+            status_cmds.append(('BACKGROUND', (3, row_idx), (3, row_idx), covered_color if covered else uncovered_color))
         
         req_table = Table(req_data, colWidths=[1.2*inch, 1*inch, 0.8*inch, 0.8*inch, 0.8*inch])
-        req_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#366092')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
-        ]))
-        
-        # Color-code coverage status
-        for row_idx in range(1, len(req_data)):
-            status = req_data[row_idx][3]
-            if status == "Yes":
-                req_table.setStyle([('BACKGROUND', (3, row_idx), (3, row_idx), HexColor('#90EE90'))])
-            else:
-                req_table.setStyle([('BACKGROUND', (3, row_idx), (3, row_idx), HexColor('#FFB6C1'))])
+        req_table.setStyle(TableStyle(status_cmds, parent=self.requirements_style))
         
         story.append(req_table)
         story.append(PageBreak())
@@ -314,5 +428,18 @@ class PDFGenerator:
                                      self.styles['TestCaseContent']))
                 story.append(Spacer(1, 8))
         
-        doc.build(story)
-        return filepath
+        return self._build_document(story, filepath, output_stream)
+    
+    def generate_all(self, test_cases, validation_results, matrix_data):
+        """
+        Generate the test case, validation and traceability PDFs.
+        The reports are independent, so they are rendered in parallel processes
+        when more than one CPU is available. Returns the three file paths.
+        """
+        inputs = (test_cases, validation_results, matrix_data)
+        workers = min(len(EXPORT_REPORTS), os.cpu_count() or 1)
+        if workers < 2:
+            return [getattr(self, name)(data) for name, data in zip(EXPORT_REPORTS, inputs)]
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as executor:
+            return list(executor.map(_render_report, EXPORT_REPORTS, inputs))
@@ -1,37 +1,117 @@
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from PyPDF2 import PdfReader
 
+# PDFium is much faster at text extraction; PyPDF2 is used when it isn't installed
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Documents up to this many pages are parsed in-process; starting workers costs more
+PARALLEL_MIN_PAGES = 50
+MIN_PAGES_PER_WORKER = 25
+
+# Extraction runs on a thread of a multi-threaded server; forking such a
+# process can copy a lock another thread holds into the child, so workers
+# come from a fork server (or are spawned where there is none)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SENTENCE_END_RE = re.compile(r"[.!?]+")
+# Whitespace runs and disallowed characters both become a single space, so
+# clean_text needs only one pass; the two alternatives never overlap
+_CLEAN_TEXT_RE = re.compile(r"\s+|[^\w\s\.\,\;\:\!\?\-\(\)]")
+
+def _choose_pdf_strategy(page_count):
+    """
+    Pick an extraction strategy based on document size.
+    """
+    if page_count <= PARALLEL_MIN_PAGES or (os.cpu_count() or 1) < 2:
+        return "sequential"
+    return "processes"
+
+def _extract_pages(pages):
+    """
+    Extracts text from a sequence of PDF pages.
+    """
+    text = ""
+    for page in pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text + "\n"
+    return text
+
+def _extract_page_range(file_path, start, end):
+    """
+    Extracts text from pages [start, end) of a PDF file (process pool worker).
+    """
+    with open(file_path, "rb") as f:
+        reader = PdfReader(f)
+        return _extract_pages(reader.pages[start:end])
+
+def _extract_text_pdfium(file_path):
+    """
+    Extracts text from a PDF file with PDFium, in the same page layout as _extract_pages.
+    """
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        text = ""
+        for page in pdf:
+            page_text = page.get_textpage().get_text_range()
+            if page_text:
+                text += page_text + "\n"
+        return text
+    finally:
+        pdf.close()
+
 def extract_text_from_pdf(file_path):
     """
     Extracts text from a PDF file.
+    Uses PDFium when available; otherwise large documents are split into
+    page ranges parsed in parallel processes with PyPDF2.
     """
-    text = ""
     try:
+        if pdfium is not None:
+            return _extract_text_pdfium(file_path)
+        
         with open(file_path, "rb") as f:
             reader = PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            page_count = len(reader.pages)
+            if _choose_pdf_strategy(page_count) == "sequential":
+                return _extract_pages(reader.pages)
+
+        workers = min(os.cpu_count(), page_count // MIN_PAGES_PER_WORKER)
+        batch_size = -(-page_count // workers)  # ceiling division
+        starts = range(0, page_count, batch_size)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as executor:
+            texts = executor.map(
+                _extract_page_range,
+                [file_path] * len(starts),
+                starts,
+                [start + batch_size for start in starts]
+            )
+            # map() yields in submission order, so page order is preserved
+            return "".join(texts)
     except Exception as e:
         raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
-    return text
-
 def clean_text(text):
     """
     Cleans text by normalizing spaces and removing extra newlines.
     """
-    # Replace multiple spaces/newlines with single space
-    text = re.sub(r"\s+", " ", text)
-    # Remove special characters but keep punctuation
-    text = re.sub(r"[^\w\s\.\,\;\:\!\?\-\(\)]", " ", text)
-    return text.strip()
+    # Replace multiple spaces/newlines with single space and special
+    # characters (but not punctuation) with a space
+    return _CLEAN_TEXT_RE.sub(" ", text).strip()
 
 def split_into_chunks(text, chunk_size=300):
     """Split text into optimized chunks for faster processing."""
     # Pre-clean text to remove unnecessary whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_RE.sub(' ', text).strip()
 
     # Split by paragraphs first for better context
     paragraphs = text.split('\n\n')
@@ -46,18 +126,22 @@ def split_into_chunks(text, chunk_size=300):
             chunks.append(paragraph)
         else:
             # Split long paragraphs by sentences
-            sentences = re.split(r'[.!?]+', paragraph)
-            current_chunk = ""
+            sentences = _SENTENCE_END_RE.split(paragraph)
+            # Sentences of the chunk being built, and the length of their
+            # space-joined text
+            current_sentences = []
+            current_len = 0
 
             for sentence in sentences:
                 sentence = sentence.strip()
                 if not sentence:
                     continue
 
-                if len(current_chunk + sentence) > chunk_size:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                        current_chunk = sentence
+                if current_len + len(sentence) > chunk_size:
+                    if current_sentences:
+                        chunks.append(' '.join(current_sentences))
+                        current_sentences = [sentence]
+                        current_len = len(sentence)
                     else:
                         # Split very long sentences
                         words = sentence.split()
@@ -65,12 +149,39 @@ def split_into_chunks(text, chunk_size=300):
                             chunk_words = words[i:i+chunk_size//10]
                             chunks.append(' '.join(chunk_words))
                 else:
-                    current_chunk += " " + sentence if current_chunk else sentence
-
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-
-    return [chunk for chunk in chunks if len(chunk.strip()) > 20]
+                    current_len += len(sentence) + 1 if current_sentences else len(sentence)
+                    current_sentences.append(sentence)
+
+            if current_sentences:
+                chunks.append(' '.join(current_sentences))
+
+    # Every chunk is already stripped
+    return [chunk for chunk in chunks if len(chunk) > 20]
+
+# Requirement section patterns, compiled once; each captures the rest of its
+# line or paragraph
+_FUNCTIONAL_SECTION_RES = [re.compile(pattern, re.MULTILINE | re.DOTALL) for pattern in (
+    r'(?i)functional\s+requirement[s]?[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
+    r'(?i)FR[_-]?\d+[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
+    r'(?i)the\s+system\s+shall[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)'
+)]
+_NON_FUNCTIONAL_SECTION_RES = [re.compile(pattern, re.MULTILINE | re.DOTALL) for pattern in (
+    r'(?i)non[_-]?functional\s+requirement[s]?[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
+    r'(?i)NFR[_-]?\d+[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
+    r'(?i)performance\s+requirement[s]?[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)'
+)]
+
+def _find_sections(section_res, text):
+    """
+    Return the non-empty captures of each pattern in turn.
+    """
+    found = []
+    for section_re in section_res:
+        for match in section_re.findall(text):
+            match = match.strip()
+            if match:
+                found.append(match)
+    return found
 
 def extract_requirements_sections(text):
     """
@@ -84,26 +195,7 @@ def extract_requirements_sections(text):
     }
 
     # Simple pattern matching for different requirement types
-    functional_patterns = [
-        r'(?i)functional\s+requirement[s]?[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-        r'(?i)FR[_-]?\d+[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-        r'(?i)the\s+system\s+shall[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)'
-    ]
-
-    non_functional_patterns = [
-        r'(?i)non[_-]?functional\s+requirement[s]?[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-        r'(?i)NFR[_-]?\d+[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-        r'(?i)performance\s+requirement[s]?[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)'
-    ]
-
-    # Extract functional requirements
-    for pattern in functional_patterns:
-        matches = re.findall(pattern, text, re.MULTILINE | re.DOTALL)
-        sections['functional'].extend([match.strip() for match in matches if match.strip()])
-
-    # Extract non-functional requirements
-    for pattern in non_functional_patterns:
-        matches = re.findall(pattern, text, re.MULTILINE | re.DOTALL)
-        sections['non_functional'].extend([match.strip() for match in matches if match.strip()])
-
-    return sections
\ No newline at end of file
+    sections['functional'] = _find_sections(_FUNCTIONAL_SECTION_RES, text)
+    sections['non_functional'] = _find_sections(_NON_FUNCTIONAL_SECTION_RES, text)
+
+    return sections
@@ -0,0 +1,76 @@
+import re
+import threading
+from collections import OrderedDict
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+
+class SemanticQueryCache:
+    """
+    LRU cache of search results keyed by the query's token set.
+
+    Keyword search only depends on the set of query tokens, so an identical
+    token set is an exact hit. Near-duplicate queries (token Jaccard
+    similarity >= threshold) reuse the closest cached result.
+
+    The cache is safe to share between request threads. Entries belong to
+    one index version: clear(version) starts a new one, and put() drops
+    results computed against any other version, so a search that raced an
+    index rebuild can't repopulate the cache with the old document.
+    """
+
+    def __init__(self, max_entries=512, threshold=0.9, version=None):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.version = version
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, query_text):
+        return frozenset(_TOKEN_RE.findall(query_text.lower()))
+
+    def get(self, query_text):
+        """
+        Return cached results for a query or a near-duplicate of it, else None.
+        """
+        tokens = self._tokens(query_text)
+        with self._lock:
+            if tokens in self._entries:
+                self._entries.move_to_end(tokens)
+                return self._entries[tokens]
+
+            best_key, best_score = None, 0.0
+            for key in self._entries:
+                union = len(tokens | key)
+                score = len(tokens & key) / union if union else 0.0
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_key)
+                return self._entries[best_key]
+            return None
+
+    def put(self, query_text, results, version=None):
+        """
+        Store results for a query, evicting the least recently used entry.
+        Results computed against an index version other than the cache's
+        are not stored.
+        """
+        tokens = self._tokens(query_text)
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[tokens] = results
+            self._entries.move_to_end(tokens)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, version=None):
+        """Drop all cached results (e.g. after the index is rebuilt to version)."""
+        with self._lock:
+            self._entries.clear()
+            self.version = version
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,88 +1,154 @@
-import re
-from collections import Counter
-import math
+import logging
+import numpy as np
+from src.encoder import tokenize_words
+
+log = logging.getLogger(__name__)
 
 # Initialize global variables
 chunks = []
+# (chunks, token count per chunk, token -> sorted chunk ids); together these
+# form a sparse binary term-document matrix. Swapped as one tuple so
+# concurrent searches never mix two indexes
+_index = ([], np.zeros(0, dtype=np.int64), {})
 
 def build_index(text_chunks):
     """Build a simple keyword-based index."""
-    global chunks
-    
+    publish_index(prepare_index(text_chunks))
+
+def prepare_index(text_chunks):
+    """
+    Tokenize chunks into an index without making it live, so the slow part
+    can run while searches keep using the current index.
+    """
     if not text_chunks:
         raise ValueError("No text chunks provided")
     
-    chunks = text_chunks
-    print(f"Built keyword index with {len(chunks)} chunks")
+    # Tokenize every chunk once; queries only tokenize themselves
+    token_sets = [frozenset(tokenize_words(chunk.lower())) for chunk in text_chunks]
+    postings = {}
+    for i, tokens in enumerate(token_sets):
+        for token in tokens:
+            postings.setdefault(token, []).append(i)
+    postings = {token: np.array(ids, dtype=np.int64) for token, ids in postings.items()}
+    token_lens = np.array([len(tokens) for tokens in token_sets], dtype=np.int64)
+    return (text_chunks, token_lens, postings)
+
+def publish_index(index):
+    """Make an index from prepare_index the one searches use."""
+    global chunks, _index
+    
+    _index = index
+    chunks = index[0]
+    log.debug("Built keyword index with %d chunks", len(chunks))
 
 def search(query_text, top_k=3):
     """Search most similar chunks using keyword matching."""
-    if not chunks:
+    index = _index
+    indexed_chunks = index[0]
+    if not indexed_chunks:
         raise ValueError("Index not built yet. Please upload a document first.")
     
     try:
-        # Simple keyword-based search
-        query_words = set(re.findall(r'\b\w+\b', query_text.lower()))
-        
-        scored_chunks = []
-        for i, chunk in enumerate(chunks):
-            chunk_words = set(re.findall(r'\b\w+\b', chunk.lower()))
-            
-            # Calculate similarity using Jaccard similarity
-            intersection = query_words.intersection(chunk_words)
-            union = query_words.union(chunk_words)
-            
-            if union:
-                similarity = len(intersection) / len(union)
-                scored_chunks.append((similarity, i, chunk))
-        
-        # Sort by similarity score (descending)
-        scored_chunks.sort(key=lambda x: x[0], reverse=True)
+        # Simple keyword-based search; an empty query has no similarity at
+        # all with an empty chunk, so those are left out
+        ranked = _rank_chunks(query_text, index, top_k, include_empty=False)
         
         # Return top-k results
-        results = [chunk for _, _, chunk in scored_chunks[:top_k]]
-        return results if results else chunks[:top_k]  # Fallback to first chunks
+        results = [indexed_chunks[i] for _, i in ranked]
+        return results if results else indexed_chunks[:top_k]  # Fallback to first chunks
         
     except Exception as e:
         raise Exception(f"Search failed: {str(e)}")
 
+def _score(query_text, index):
+    """
+    Return the Jaccard similarity of every indexed chunk with the query, and
+    the size of each query/chunk token union.
+    """
+    _, token_lens, postings = index
+    query_words = set(tokenize_words(query_text.lower()))
+    query_len = len(query_words)
+    
+    # Intersection counts for every chunk at once: summing the query tokens'
+    # posting lists is the term-document matrix times the query vector
+    shared = [postings[token] for token in query_words if token in postings]
+    if shared:
+        intersections = np.bincount(np.concatenate(shared), minlength=len(token_lens))
+    else:
+        intersections = np.zeros(len(token_lens), dtype=np.int64)
+    unions = query_len + token_lens - intersections
+    
+    # Calculate similarity using Jaccard similarity
+    similarities = np.divide(intersections, unions, out=np.zeros(len(token_lens)), where=unions > 0)
+    return similarities, unions
+
+def _rank_chunks(query_text, index, top_k, include_empty=True):
+    """
+    Return the top_k (similarity, chunk id) pairs by Jaccard similarity, ties
+    broken by chunk order.
+    """
+    similarities, unions = _score(query_text, index)
+    candidates = np.arange(len(similarities)) if include_empty else np.flatnonzero(unions > 0)
+    scores = similarities[candidates]
+    
+    if 0 < top_k < len(scores):
+        # Only the top_k need ordering: find the top_k-th largest score in
+        # linear time, keep everything above it and the earliest chunks tied
+        # with it, then sort just those
+        threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:top_k - len(above)]
+        selected = np.concatenate((above, tied))
+        selected.sort()
+        order = selected[np.argsort(-scores[selected], kind='stable')]
+    else:
+        order = np.argsort(-scores, kind='stable')[:top_k]
+    
+    ids = candidates[order]
+    return [(float(similarities[i]), int(i)) for i in ids]
+
 def get_similarity_scores(query_text, top_k=10):
     """Get similarity scores for chunks using keyword matching."""
-    if not chunks:
+    index = _index
+    if not index[0]:
         return []
     
     try:
-        query_words = set(re.findall(r'\b\w+\b', query_text.lower()))
-        
-        results = []
-        for i, chunk in enumerate(chunks):
-            chunk_words = set(re.findall(r'\b\w+\b', chunk.lower()))
-            
-            # Calculate similarity
-            intersection = query_words.intersection(chunk_words)
-            union = query_words.union(chunk_words)
-            
-            if union:
-                similarity = len(intersection) / len(union)
-            else:
-                similarity = 0.0
-            
-            results.append({
-                'chunk': chunk,
-                'similarity': similarity,
-                'index': i
-            })
-        
-        # Sort by similarity and return top_k
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:top_k]
+        return _similarity_results(query_text, index, top_k)
         
     except Exception as e:
-        print(f"Error getting similarity scores: {e}")
+        log.warning("Error getting similarity scores: %s", e)
         return []
 
+def get_similarity_scores_batch(query_texts, top_k=10):
+    """Get similarity scores for several queries against the same index."""
+    index = _index
+    if not index[0]:
+        return [[] for _ in query_texts]
+    
+    try:
+        return [_similarity_results(query_text, index, top_k) for query_text in query_texts]
+        
+    except Exception as e:
+        log.warning("Error getting similarity scores: %s", e)
+        return [[] for _ in query_texts]
+
+def _similarity_results(query_text, index, top_k):
+    """Score chunks against one query and return the top_k results."""
+    indexed_chunks = index[0]
+    
+    # Sort by similarity and return top_k
+    return [
+        {
+            'chunk': indexed_chunks[i],
+            'similarity': similarity,
+            'index': i
+        }
+        for similarity, i in _rank_chunks(query_text, index, top_k)
+    ]
+
 def embed_text(text):
     """Simple text representation (for compatibility)."""
     # This is just for compatibility - not actually used in keyword search
-    words = re.findall(r'\b\w+\b', text.lower())
+    words = tokenize_words(text.lower())
     return hash(' '.join(words)) % 1000  # Simple hash-based representation
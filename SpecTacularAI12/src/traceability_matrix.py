@@ -1,9 +1,43 @@
 import os
+from collections import Counter, defaultdict
 from datetime import datetime
 from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+# Words too common to count as a keyword overlap between a test case and a requirement
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'is', 'of', 'to', 'and', 'or', 'for', 'in', 'on',
+    'with', 'be', 'will', 'shall', 'this', 'that'
+})
+MIN_KEYWORD_LENGTH = 3
+
+# Column width used by optimized Excel exports, which skip measuring cells
+FIXED_COLUMN_WIDTH = 20
+
+# Cell styles shared by every sheet; openpyxl stores styles by value, so
+# one instance serves any number of cells and workbooks
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_COVERED_FILL = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
+_UNCOVERED_FILL = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
+_CENTER = Alignment(horizontal="center", vertical="center")
+_TITLE_FONT = Font(bold=True, size=14)
+_SECTION_FONT = Font(bold=True, size=12)
+
+def _keywords(text):
+    """
+    Return the set of matching keywords in lowercased text.
+    """
+    return {word for word in text.split() if len(word) >= MIN_KEYWORD_LENGTH and word not in _STOP_WORDS}
+
+def _truncate(text, limit=200):
+    """
+    Shorten text longer than limit characters, marking the cut with "...".
+    """
+    return text[:limit] + "..." if len(text) > limit else text
+
 class TraceabilityMatrix:
     def __init__(self):
         self.matrix_data = None
@@ -24,18 +58,30 @@ class TraceabilityMatrix:
             }
         }
         
-        # Process requirements
+        # Process requirements, indexing the entries by id for coverage
+        # updates; with duplicate ids the first entry is the one updated
+        req_by_id = {}
         for req in requirements:
             req_entry = {
                 'id': req['id'],
                 'type': req.get('type', 'general'),
                 'priority': req.get('priority', 'medium'),
                 'category': req.get('category', 'general'),
-                'content': req['content'][:200] + "..." if len(req['content']) > 200 else req['content'],
+                'content': _truncate(req['content']),
                 'covered': False,
                 'test_case_count': 0
             }
             matrix['requirements'].append(req_entry)
+            req_by_id.setdefault(req_entry['id'], req_entry)
+        
+        # Tokenize each requirement once rather than once per test case, into
+        # an inverted index word -> positions of the requirements using it
+        req_ids = [req['id'] for req in requirements]
+        postings = {}
+        for position, req in enumerate(requirements):
+            for word in _keywords(req['content'].lower()):
+                postings.setdefault(word, []).append(position)
+        req_index = (req_ids, postings)
         
         # Process test cases and create mappings
         for tc in test_cases:
@@ -49,7 +95,7 @@ class TraceabilityMatrix:
             }
             
             # Find mapped requirements for this test case
-            mapped_req_ids = self._find_mapped_requirements(tc, requirements)
+            mapped_req_ids = self._find_mapped_requirements(tc, req_index)
             tc_entry['requirement_mappings'] = mapped_req_ids
             
             # Update requirement coverage
@@ -59,20 +105,21 @@ class TraceabilityMatrix:
                 matrix['mappings'][req_id].append(tc.get('id'))
                 
                 # Update requirement coverage status
-                for req in matrix['requirements']:
-                    if req['id'] == req_id:
-                        req['covered'] = True
-                        req['test_case_count'] += 1
-                        break
+                req = req_by_id.get(req_id)
+                if req is not None:
+                    req['covered'] = True
+                    req['test_case_count'] += 1
             
             matrix['test_cases'].append(tc_entry)
         
         self.matrix_data = matrix
         return matrix
     
-    def _find_mapped_requirements(self, test_case, requirements):
+    def _find_mapped_requirements(self, test_case, req_index):
         """
-        Find requirements mapped to a test case.
+        Find requirements mapped to a test case. req_index is the
+        (requirement ids, word -> requirement positions) pair built by
+        generate_matrix.
         """
         mapped_reqs = []
         
@@ -88,16 +135,22 @@ class TraceabilityMatrix:
             test_case.get('steps', ''),
             test_case.get('query', '')
         ]).lower()
-        
-        for req in requirements:
-            req_keywords = set(req['content'].lower().split())
-            test_keywords = set(test_content.split())
-            
-            # Simple keyword overlap check
-            overlap = req_keywords.intersection(test_keywords)
-            if len(overlap) >= 3:  # Minimum overlap threshold
-                if req['id'] not in mapped_reqs:
-                    mapped_reqs.append(req['id'])
+        test_keywords = _keywords(test_content)
+        
+        # Simple keyword overlap check: count the shared words of every
+        # requirement at once from the posting lists
+        req_ids, postings = req_index
+        overlaps = Counter()
+        for word in test_keywords:
+            overlaps.update(postings.get(word, ()))
+        
+        # Minimum overlap threshold; only the requirements that pass it
+        # need ordering
+        matched = [position for position, count in overlaps.items() if count >= 3]
+        for position in sorted(matched):
+            req_id = req_ids[position]
+            if req_id not in mapped_reqs:
+                mapped_reqs.append(req_id)
         
         return mapped_reqs
     
@@ -112,30 +165,22 @@ class TraceabilityMatrix:
         test_cases = matrix_data['test_cases']
         
         total_reqs = len(requirements)
-        covered_reqs = sum(1 for req in requirements if req['covered'])
-        uncovered_reqs = total_reqs - covered_reqs
-        
-        # Coverage by type
-        coverage_by_type = {}
-        for req in requirements:
-            req_type = req['type']
-            if req_type not in coverage_by_type:
-                coverage_by_type[req_type] = {'total': 0, 'covered': 0}
-            
-            coverage_by_type[req_type]['total'] += 1
-            if req['covered']:
-                coverage_by_type[req_type]['covered'] += 1
         
-        # Coverage by priority
-        coverage_by_priority = {}
+        # Coverage overall, by type and by priority in one pass; buckets are
+        # [total, covered]
+        covered_reqs = 0
+        coverage_by_type = defaultdict(lambda: [0, 0])
+        coverage_by_priority = defaultdict(lambda: [0, 0])
         for req in requirements:
-            priority = req['priority']
-            if priority not in coverage_by_priority:
-                coverage_by_priority[priority] = {'total': 0, 'covered': 0}
-            
-            coverage_by_priority[priority]['total'] += 1
+            type_bucket = coverage_by_type[req['type']]
+            priority_bucket = coverage_by_priority[req['priority']]
+            type_bucket[0] += 1
+            priority_bucket[0] += 1
             if req['covered']:
-                coverage_by_priority[priority]['covered'] += 1
+                covered_reqs += 1
+                type_bucket[1] += 1
+                priority_bucket[1] += 1
+        uncovered_reqs = total_reqs - covered_reqs
         
         # Test case distribution
         tc_by_type = {}
@@ -143,7 +188,7 @@ class TraceabilityMatrix:
             tc_type = tc['type']
             tc_by_type[tc_type] = tc_by_type.get(tc_type, 0) + 1
         
-        return {
+        coverage_stats = {
             'overall_coverage': {
                 'total_requirements': total_reqs,
                 'covered_requirements': covered_reqs,
@@ -152,19 +197,19 @@ class TraceabilityMatrix:
             },
             'coverage_by_type': {
                 req_type: {
-                    'total': data['total'],
-                    'covered': data['covered'],
-                    'percentage': round((data['covered'] / data['total'] * 100) if data['total'] > 0 else 0, 2)
+                    'total': total,
+                    'covered': covered,
+                    'percentage': round((covered / total * 100) if total > 0 else 0, 2)
                 }
-                for req_type, data in coverage_by_type.items()
+                for req_type, (total, covered) in coverage_by_type.items()
             },
             'coverage_by_priority': {
                 priority: {
-                    'total': data['total'],
-                    'covered': data['covered'],
-                    'percentage': round((data['covered'] / data['total'] * 100) if data['total'] > 0 else 0, 2)
+                    'total': total,
+                    'covered': covered,
+                    'percentage': round((covered / total * 100) if total > 0 else 0, 2)
                 }
-                for priority, data in coverage_by_priority.items()
+                for priority, (total, covered) in coverage_by_priority.items()
             },
             'test_case_distribution': tc_by_type,
             'uncovered_requirements': [
@@ -172,10 +217,20 @@ class TraceabilityMatrix:
                 for req in requirements if not req['covered']
             ][:10]  # Top 10 uncovered
         }
+        
+        return coverage_stats
     
-    def export_to_excel(self, matrix_data, filename=None):
+    def export_to_excel(self, matrix_data, filename=None, optimize=False, coverage_stats=None):
         """
         Export traceability matrix to Excel file.
+        The workbook is write-only, so rows are streamed to the file instead
+        of being held as cell objects until the save. With optimize, the
+        matrix, requirements and test case sheets are written as their rows
+        are built: columns get FIXED_COLUMN_WIDTH instead of being measured
+        and coverage cells are plain values without fills, so memory stays
+        flat for very large matrices.
+        coverage_stats, if given, must be calculate_coverage_stats(matrix_data);
+        it is computed here otherwise.
         """
         if not filename:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -184,219 +239,202 @@ class TraceabilityMatrix:
         filepath = os.path.join('data', 'exports', filename)
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        workbook = Workbook()
+        workbook = Workbook(write_only=True)
         
         # Create worksheets
-        self._create_matrix_sheet(workbook, matrix_data)
-        self._create_requirements_sheet(workbook, matrix_data)
-        self._create_test_cases_sheet(workbook, matrix_data)
-        self._create_coverage_sheet(workbook, matrix_data)
-        
-        # Remove default sheet
-        if 'Sheet' in workbook.sheetnames:
-            workbook.remove(workbook['Sheet'])
+        self._create_matrix_sheet(workbook, matrix_data, optimize)
+        self._create_requirements_sheet(workbook, matrix_data, optimize)
+        self._create_test_cases_sheet(workbook, matrix_data, optimize)
+        self._create_coverage_sheet(workbook, matrix_data, coverage_stats)
         
         workbook.save(filepath)
         return filepath
     
-    def _create_matrix_sheet(self, workbook, matrix_data):
+    def _create_matrix_sheet(self, workbook, matrix_data, optimize=False):
         """
         Create main traceability matrix sheet.
         """
-        ws = workbook.active
-        ws.title = "Traceability Matrix"
-        
+        ws = workbook.create_sheet("Traceability Matrix")
+        self._write_rows(ws, self._matrix_rows(ws, matrix_data, optimize), optimize)
+    
+    def _matrix_rows(self, ws, matrix_data, optimize):
+        """
+        Yield the rows of the traceability matrix sheet.
+        """
         requirements = matrix_data['requirements']
         test_cases = matrix_data['test_cases']
         mappings = matrix_data['mappings']
         
-        # Headers
-        ws['A1'] = "Requirement ID"
-        ws['B1'] = "Requirement Type"
-        ws['C1'] = "Priority"
-        ws['D1'] = "Content"
-        
-        # Test case headers (starting from column E)
-        start_col = 5  # Column E
-        for i, tc in enumerate(test_cases):
-            col_letter = get_column_letter(start_col + i)
-            ws[f'{col_letter}1'] = tc['id']
-        
-        # Style headers
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        
-        for col in range(1, start_col + len(test_cases)):
-            cell = ws.cell(row=1, column=col)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        # Headers, with test case headers starting from column E
+        headers = ["Requirement ID", "Requirement Type", "Priority", "Content"]
+        headers.extend(tc['id'] for tc in test_cases)
+        yield self._style_headers(ws, headers)
         
         # Fill requirement data
-        for row, req in enumerate(requirements, start=2):
-            ws[f'A{row}'] = req['id']
-            ws[f'B{row}'] = req['type']
-            ws[f'C{row}'] = req['priority']
-            ws[f'D{row}'] = req['content']
+        for req in requirements:
+            row = [req['id'], req['type'], req['priority'], req['content']]
             
-            # Mark test case mappings
+            # Mark test case mappings; unmapped cells are left out of the
+            # sheet (None) rather than written as empty strings
             req_id = req['id']
-            mapped_tcs = mappings.get(req_id, [])
+            mapped_tcs = set(mappings.get(req_id, []))
             
-            for col, tc in enumerate(test_cases, start=start_col):
-                cell = ws.cell(row=row, column=col)
-                if tc['id'] in mapped_tcs:
-                    cell.value = "✓"
-                    cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
+            for tc in test_cases:
+                if tc['id'] not in mapped_tcs:
+                    row.append(None)
+                elif optimize:
+                    row.append("✓")
                 else:
-                    cell.value = ""
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+                    cell = WriteOnlyCell(ws, value="✓")
+                    cell.fill = _COVERED_FILL
+                    cell.alignment = _CENTER
+                    row.append(cell)
+            yield row
     
-    def _create_requirements_sheet(self, workbook, matrix_data):
+    def _create_requirements_sheet(self, workbook, matrix_data, optimize=False):
         """
         Create detailed requirements sheet.
         """
         ws = workbook.create_sheet("Requirements Details")
-        
+        self._write_rows(ws, self._requirements_rows(ws, matrix_data, optimize), optimize)
+    
+    def _requirements_rows(self, ws, matrix_data, optimize):
+        """
+        Yield the rows of the requirements details sheet.
+        """
         headers = ["ID", "Type", "Priority", "Category", "Content", "Covered", "Test Case Count"]
-        for col, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col, value=header)
         
         # Style headers
-        self._style_headers(ws, len(headers))
+        yield self._style_headers(ws, headers)
         
         # Fill data
-        for row, req in enumerate(matrix_data['requirements'], start=2):
-            ws.cell(row=row, column=1, value=req['id'])
-            ws.cell(row=row, column=2, value=req['type'])
-            ws.cell(row=row, column=3, value=req['priority'])
-            ws.cell(row=row, column=4, value=req['category'])
-            ws.cell(row=row, column=5, value=req['content'])
-            ws.cell(row=row, column=6, value="Yes" if req['covered'] else "No")
-            ws.cell(row=row, column=7, value=req['test_case_count'])
+        for req in matrix_data['requirements']:
+            coverage = "Yes" if req['covered'] else "No"
+            if not optimize:
+                # Color-code coverage
+                coverage = WriteOnlyCell(ws, value=coverage)
+                if req['covered']:
+                    coverage.fill = _COVERED_FILL
+                else:
+                    coverage.fill = _UNCOVERED_FILL
             
-            # Color-code coverage
-            coverage_cell = ws.cell(row=row, column=6)
-            if req['covered']:
-                coverage_cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-            else:
-                coverage_cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
-        
-        self._auto_adjust_columns(ws)
+            yield [
+                req['id'],
+                req['type'],
+                req['priority'],
+                req['category'],
+                req['content'],
+                coverage,
+                req['test_case_count']
+            ]
     
-    def _create_test_cases_sheet(self, workbook, matrix_data):
+    def _create_test_cases_sheet(self, workbook, matrix_data, optimize=False):
         """
         Create detailed test cases sheet.
         """
         ws = workbook.create_sheet("Test Cases Details")
-        
+        self._write_rows(ws, self._test_cases_rows(ws, matrix_data), optimize)
+    
+    def _test_cases_rows(self, ws, matrix_data):
+        """
+        Yield the rows of the test cases details sheet.
+        """
         headers = ["ID", "Title", "Type", "Priority", "Status", "Mapped Requirements"]
-        for col, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col, value=header)
-        
-        self._style_headers(ws, len(headers))
+        yield self._style_headers(ws, headers)
         
         # Fill data
-        for row, tc in enumerate(matrix_data['test_cases'], start=2):
-            ws.cell(row=row, column=1, value=tc['id'])
-            ws.cell(row=row, column=2, value=tc['title'])
-            ws.cell(row=row, column=3, value=tc['type'])
-            ws.cell(row=row, column=4, value=tc['priority'])
-            ws.cell(row=row, column=5, value=tc['status'])
-            ws.cell(row=row, column=6, value=", ".join(tc['requirement_mappings']))
-        
-        self._auto_adjust_columns(ws)
+        for tc in matrix_data['test_cases']:
+            yield [
+                tc['id'],
+                tc['title'],
+                tc['type'],
+                tc['priority'],
+                tc['status'],
+                ", ".join(tc['requirement_mappings'])
+            ]
     
-    def _create_coverage_sheet(self, workbook, matrix_data):
+    def _create_coverage_sheet(self, workbook, matrix_data, coverage_stats=None):
         """
         Create coverage statistics sheet.
         """
         ws = workbook.create_sheet("Coverage Statistics")
         
-        coverage_stats = self.calculate_coverage_stats(matrix_data)
-        
-        row = 1
+        if coverage_stats is None:
+            coverage_stats = self.calculate_coverage_stats(matrix_data)
         
         # Overall coverage
-        ws[f'A{row}'] = "Overall Coverage"
-        ws[f'A{row}'].font = Font(bold=True, size=14)
-        row += 2
+        title_cell = WriteOnlyCell(ws, value="Overall Coverage")
+        title_cell.font = _TITLE_FONT
+        rows = [[title_cell], []]
         
         overall = coverage_stats['overall_coverage']
-        ws[f'A{row}'] = "Total Requirements:"
-        ws[f'B{row}'] = overall['total_requirements']
-        row += 1
-        
-        ws[f'A{row}'] = "Covered Requirements:"
-        ws[f'B{row}'] = overall['covered_requirements']
-        row += 1
-        
-        ws[f'A{row}'] = "Uncovered Requirements:"
-        ws[f'B{row}'] = overall['uncovered_requirements']
-        row += 1
-        
-        ws[f'A{row}'] = "Coverage Percentage:"
-        ws[f'B{row}'] = f"{overall['coverage_percentage']}%"
-        row += 3
+        rows.append(["Total Requirements:", overall['total_requirements']])
+        rows.append(["Covered Requirements:", overall['covered_requirements']])
+        rows.append(["Uncovered Requirements:", overall['uncovered_requirements']])
+        rows.append(["Coverage Percentage:", f"{overall['coverage_percentage']}%"])
+        rows.extend([[], []])
         
         # Coverage by type
-        ws[f'A{row}'] = "Coverage by Type"
-        ws[f'A{row}'].font = Font(bold=True, size=12)
-        row += 1
-        
-        ws[f'A{row}'] = "Type"
-        ws[f'B{row}'] = "Total"
-        ws[f'C{row}'] = "Covered"
-        ws[f'D{row}'] = "Percentage"
-        row += 1
+        type_title_cell = WriteOnlyCell(ws, value="Coverage by Type")
+        type_title_cell.font = _SECTION_FONT
+        rows.append([type_title_cell])
+        rows.append(["Type", "Total", "Covered", "Percentage"])
         
         for req_type, data in coverage_stats['coverage_by_type'].items():
-            ws[f'A{row}'] = req_type
-            ws[f'B{row}'] = data['total']
-            ws[f'C{row}'] = data['covered']
-            ws[f'D{row}'] = f"{data['percentage']}%"
-            row += 1
+            rows.append([req_type, data['total'], data['covered'], f"{data['percentage']}%"])
         
-        self._auto_adjust_columns(ws)
+        self._write_rows(ws, rows)
     
-    def _style_headers(self, ws, num_cols):
+    def _style_headers(self, ws, headers):
         """
-        Apply header styling.
+        Return the header row as styled cells.
         """
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        
-        for col in range(1, num_cols + 1):
-            cell = ws.cell(row=1, column=col)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = _HEADER_FONT
+            cell.fill = _HEADER_FILL
+            cell.alignment = _CENTER
+            cells.append(cell)
+        return cells
+    
+    def _write_rows(self, ws, rows, optimize=False):
+        """
+        Stream the rows to a write-only sheet. Widths have to be set before
+        the first row is written: they are measured from all the rows, or
+        with optimize the header row's columns get FIXED_COLUMN_WIDTH and
+        each row is written as soon as it is produced.
+        """
+        if optimize:
+            rows = iter(rows)
+            headers = next(rows, None)
+            if headers is None:
+                return
+            for col in range(1, len(headers) + 1):
+                ws.column_dimensions[get_column_letter(col)].width = FIXED_COLUMN_WIDTH
+            ws.append(headers)
+        else:
+            rows = list(rows)
+            self._auto_adjust_columns(ws, rows)
+        for row in rows:
+            ws.append(row)
     
-    def _auto_adjust_columns(self, ws):
+    def _auto_adjust_columns(self, ws, rows):
         """
-        Auto-adjust column widths.
+        Auto-adjust column widths, in one pass over the rows.
         """
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
+        max_lengths = []
+        for row in rows:
+            for col, value in enumerate(row):
+                if isinstance(value, Cell):
+                    value = value.value
+                # Empty cells add no width
+                length = 0 if value is None else len(str(value))
+                if col == len(max_lengths):
+                    max_lengths.append(length)
+                elif length > max_lengths[col]:
+                    max_lengths[col] = length
+        
+        for col, max_length in enumerate(max_lengths, 1):
             adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            ws.column_dimensions[get_column_letter(col)].width = adjusted_width
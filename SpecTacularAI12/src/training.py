@@ -5,9 +5,69 @@ This provides training utilities and model management.
 
 import json
 import os
+import re
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Any
 
+import numpy as np
+
+# orjson serializes much faster; the stdlib json module is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Digit runs long enough to be an integer outside the 64-bit range
+_LONG_NUMBER_RE = re.compile(rb'\d{20}')
+
+def _encode_json(data, indent=False):
+    """
+    Serialize data to JSON bytes. Anything orjson rejects (integers beyond
+    64 bits, unusual key types) goes through the stdlib json module, so
+    everything json accepts can still be saved.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            pass
+    return json.dumps(data, indent=2 if indent else None).encode()
+
+def _dump_json(data, path):
+    """Write data to path as indented JSON."""
+    # Serialize first, so a failure leaves an existing file untouched
+    content = _encode_json(data, indent=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+def _append_json_line(data, path):
+    """Append data to path as one compact JSON line."""
+    line = _encode_json(data) + b'\n'
+    with open(path, 'ab') as f:
+        f.write(line)
+
+def _decode_json(content):
+    """Parse JSON bytes."""
+    # orjson reads integers beyond 64 bits as floats; leave any long digit
+    # run to the stdlib json module, which keeps them exact
+    if orjson is not None and not _LONG_NUMBER_RE.search(content):
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _load_json(path):
+    """Read a JSON document from path."""
+    with open(path, 'rb') as f:
+        return _decode_json(f.read())
+
+# Training runs are appended to a JSON-lines file, one run per line;
+# older versions rewrote the whole history as one JSON list
+HISTORY_FILE = "training_history.jsonl"
+LEGACY_HISTORY_FILE = "training_history.json"
+
 class SimpleTrainer:
     """A simplified trainer for managing models and training data."""
     
@@ -41,8 +101,8 @@ class SimpleTrainer:
             'batch_size': batch_size,
             'train_samples': len(train_data),
             'validation_samples': len(validation_data) if validation_data else 0,
-            'training_loss': [self._simulate_loss(i, epochs) for i in range(epochs)],
-            'validation_loss': [self._simulate_loss(i, epochs, offset=0.1) for i in range(epochs)] if validation_data else None,
+            'training_loss': self._simulate_loss(epochs),
+            'validation_loss': self._simulate_loss(epochs, offset=0.1) if validation_data else None,
             'final_accuracy': 0.85 + (0.1 * min(epochs / 20, 1)),  # Simulate improving accuracy
             'status': 'completed'
         }
@@ -54,14 +114,14 @@ class SimpleTrainer:
         print(f"Training completed. Final accuracy: {training_results['final_accuracy']:.3f}")
         return training_results
     
-    def _simulate_loss(self, epoch: int, total_epochs: int, offset: float = 0) -> float:
-        """Simulate decreasing loss over epochs."""
-        import math
+    def _simulate_loss(self, total_epochs: int, offset: float = 0) -> List[float]:
+        """Simulate decreasing loss over epochs, for all epochs at once."""
+        epoch = np.arange(total_epochs)
         # Exponential decay with some noise
         base_loss = 2.0 + offset
         decay_rate = 0.1
-        noise = 0.1 * math.sin(epoch * 0.5)  # Add some variation
-        return max(0.1, base_loss * math.exp(-decay_rate * epoch) + noise)
+        noise = 0.1 * np.sin(epoch * 0.5)  # Add some variation
+        return np.maximum(0.1, base_loss * np.exp(-decay_rate * epoch) + noise).tolist()
     
     def save_model(self, model_name: str, model_data: Dict = None) -> str:
         """
@@ -84,8 +144,7 @@ class SimpleTrainer:
         
         model_path = os.path.join(self.model_dir, f"{model_name}.json")
         
-        with open(model_path, 'w') as f:
-            json.dump(model_data, f, indent=2)
+        _dump_json(model_data, model_path)
         
         print(f"Model saved to {model_path}")
         return model_path
@@ -105,30 +164,48 @@ class SimpleTrainer:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model {model_name} not found at {model_path}")
         
-        with open(model_path, 'r') as f:
-            model_data = json.load(f)
+        model_data = _load_json(model_path)
         
         print(f"Model {model_name} loaded successfully")
         return model_data
     
     def list_models(self) -> List[str]:
         """List available saved models."""
-        if not os.path.exists(self.model_dir):
+        try:
+            with os.scandir(self.model_dir) as entries:
+                # Remove .json extension
+                return [entry.name[:-5] for entry in entries
+                        if entry.name.endswith('.json') and entry.is_file()]
+        except FileNotFoundError:
             return []
+    
+    def _save_training_history(self):
+        """Append the latest training run to the history file."""
+        history_path = os.path.join(self.model_dir, HISTORY_FILE)
+        self._migrate_training_history(history_path)
         
-        models = []
-        for file in os.listdir(self.model_dir):
-            if file.endswith('.json'):
-                models.append(file[:-5])  # Remove .json extension
+        _append_json_line(self.training_history[-1], history_path)
+    
+    def _migrate_training_history(self, history_path):
+        """Move runs from a legacy training_history.json into the JSON-lines file."""
+        legacy_path = os.path.join(self.model_dir, LEGACY_HISTORY_FILE)
+        if not os.path.exists(legacy_path):
+            return
         
-        return models
+        if not os.path.exists(history_path):
+            for run in _load_json(legacy_path):
+                _append_json_line(run, history_path)
+        os.remove(legacy_path)
     
-    def _save_training_history(self):
-        """Save training history to file."""
-        history_path = os.path.join(self.model_dir, "training_history.json")
+    def load_training_history(self) -> List[Dict]:
+        """Load every training run recorded in the model directory."""
+        history_path = os.path.join(self.model_dir, HISTORY_FILE)
+        self._migrate_training_history(history_path)
+        if not os.path.exists(history_path):
+            return []
         
-        with open(history_path, 'w') as f:
-            json.dump(self.training_history, f, indent=2)
+        with open(history_path, 'rb') as f:
+            return [_decode_json(line) for line in f if line.strip()]
     
     def get_training_history(self) -> List[Dict]:
         """Get training history."""
@@ -147,9 +224,16 @@ class SimpleTrainer:
         """
         training_data = []
         
+        # Group test cases by requirement id once, keeping their order
+        cases_by_req = defaultdict(list)
+        for tc in test_cases:
+            req_id = tc.get('requirement_id')
+            if req_id:
+                cases_by_req[req_id].append(tc)
+        
         for i, req in enumerate(requirements):
             # Find matching test cases for this requirement
-            matching_cases = [tc for tc in test_cases if tc.get('requirement_id') == f"REQ_{i+1:03d}"]
+            matching_cases = cases_by_req.get(f"REQ_{i+1:03d}")
             
             if matching_cases:
                 for case in matching_cases:
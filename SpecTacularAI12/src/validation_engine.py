@@ -1,8 +1,133 @@
+import multiprocessing
 import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+# pyahocorasick finds any of a group of keywords in one pass over the text;
+# each keyword is searched for separately when it isn't installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# A structured step line starts, after any indentation, with a number,
+# "Step N", a "a)" style marker or a bullet; one search over the whole
+# steps text checks every line
+_STEP_STRUCTURE_RE = re.compile(r'^\s*(?:\d+\.|Step \d+|\w+\)|-|\*)', re.MULTILINE)
+
+def _keyword_matcher(keywords):
+    """
+    Return a function telling whether a lowercased text contains any of the
+    keywords. Keywords are deduplicated and tried longest first, and texts
+    shorter than the shortest keyword are rejected without a scan.
+    """
+    keywords = tuple(sorted(set(keywords), key=lambda keyword: (-len(keyword), keyword)))
+    shortest = len(keywords[-1])
+    
+    if ahocorasick is None:
+        return lambda text: len(text) >= shortest and any(keyword in text for keyword in keywords)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return lambda text: len(text) >= shortest and next(automaton.iter(text), None) is not None
+
+# Keyword groups the rules look for, in lowercased text
+_ACTION_VERBS = ('click', 'enter', 'select', 'verify', 'check', 'navigate', 'input', 'submit')
+_VAGUE_TERMS = ('should work', 'works correctly', 'functions properly', 'behaves as expected')
+_DATA_KEYWORDS = ('username', 'password', 'email', 'data', 'input', 'value', 'credentials')
+_AMBIGUOUS_TERMS = ('might', 'could', 'maybe', 'possibly', 'probably', 'seems')
+_PASSIVE_INDICATORS = ('is done', 'are performed', 'will be', 'should be')
+_MEASURABLE_INDICATORS = (
+    'displays', 'shows', 'appears', 'contains', 'equals', 'returns',
+    'status code', 'message', 'error', 'success', 'redirects', 'loads'
+)
+
+_has_action_verb = _keyword_matcher(_ACTION_VERBS)
+_has_vague_term = _keyword_matcher(_VAGUE_TERMS)
+_has_data_keyword = _keyword_matcher(_DATA_KEYWORDS)
+_has_ambiguous_term = _keyword_matcher(_AMBIGUOUS_TERMS)
+_has_passive_indicator = _keyword_matcher(_PASSIVE_INDICATORS)
+_has_measurable_indicator = _keyword_matcher(_MEASURABLE_INDICATORS)
+
+_GENERIC_TITLES = frozenset({'test case', 'test', 'untitled'})
+# Kept in order for the warning message that lists them
+_VALID_PRIORITIES = ('high', 'medium', 'low', 'critical', 'normal')
+_VALID_PRIORITY_SET = frozenset(_VALID_PRIORITIES)
+# Lowercasing never shortens text, so anything longer than these can't be
+# in the sets above and skips the lowercase lookup
+_LONGEST_GENERIC_TITLE = max(map(len, _GENERIC_TITLES))
+_LONGEST_PRIORITY = max(map(len, _VALID_PRIORITIES))
+
+# Batches smaller than this are validated in-process even when workers are
+# requested; shipping test cases and results between processes costs more
+PARALLEL_MIN_TEST_CASES = 1000
+# Each worker gets about this many batches, to even out uneven test cases
+BATCHES_PER_WORKER = 4
+# Validation is called from request threads; a forked worker could inherit
+# a lock some other thread was holding, so workers are started by a fork
+# server, or spawned where there is none
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Rules whose failure makes a test case invalid
+_CRITICAL_RULES = frozenset({'has_title', 'has_steps', 'has_expected_result'})
+
+# Test case fields the rules read; test cases agreeing on all of them
+# (and on whether they have test data) get the same validation result
+_CACHE_KEY_FIELDS = ('title', 'description', 'steps', 'expected', 'priority', 'requirement_id')
+
+def _copy_result(result):
+    """
+    Copy a validation result deep enough that changing the copy's lists
+    and dicts leaves the original untouched.
+    """
+    copy = dict(result, errors=list(result['errors']), warnings=list(result['warnings']))
+    copy['details'] = {
+        rule_name: dict(rule_result, errors=list(rule_result['errors']), warnings=list(rule_result['warnings']))
+        for rule_name, rule_result in result['details'].items()
+    }
+    return copy
+
+def _validate_batch(test_cases, requirements, fail_fast, rule_methods):
+    """
+    Validate a batch of test cases with a fresh engine running the caller's
+    rules, given as (rule name, method name) pairs (process pool worker).
+    """
+    engine = ValidationEngine(fail_fast=fail_fast)
+    engine.validation_rules = {
+        rule_name: getattr(engine, method_name) for rule_name, method_name in rule_methods
+    }
+    return engine.validate_test_cases(test_cases, requirements)
+
+class _LoweredFields(dict):
+    """
+    Lowercased test case fields, each computed on first use and shared by
+    all the rules validating the test case.
+    """
+    def __init__(self, test_case):
+        super().__init__()
+        self.test_case = test_case
+    
+    def __missing__(self, field):
+        value = self[field] = self.test_case.get(field, '').lower()
+        return value
+
 class ValidationEngine:
-    def __init__(self):
+    def __init__(self, cache_size=0, fail_fast=False):
+        """
+        With cache_size > 0, the results of up to that many distinct test
+        cases are kept, so validating a test case with the same content again
+        skips the rules. Cached results are only reused while validating
+        against the same requirements list, which must not be modified in
+        place in the meantime.
+        With fail_fast, the critical rules run first and validation of a test
+        case stops as soon as it is invalid; the rules that did not run are
+        listed under 'skipped' and count as not passed in the score.
+        """
         self.validation_rules = {
             'has_title': self._check_title,
             'has_description': self._check_description,
@@ -14,19 +139,108 @@ class ValidationEngine:
             'step_clarity': self._check_step_clarity,
             'result_measurable': self._check_measurable_result
         }
+        self.cache_size = cache_size
+        self.fail_fast = fail_fast
+        self._cache = OrderedDict()
+        self._cache_requirements = None
+        # (requirements, set of their ids) for the current validation run
+        self._requirement_ids = (None, None)
     
-    def validate_test_cases(self, test_cases, requirements=None):
+    def validate_test_cases(self, test_cases, requirements=None, workers=None):
         """
         Validate all test cases against defined rules.
+        With workers >= 2, batches of at least PARALLEL_MIN_TEST_CASES test
+        cases are split across that many processes (without the result
+        cache); results keep the order of test_cases. Workers rebuild
+        validation_rules from the engine's own _check_* methods, so when it
+        holds any other rule function, or the engine is a subclass, the
+        test cases are validated in-process instead.
         """
+        test_cases = list(test_cases)
+        if workers and workers >= 2 and len(test_cases) >= PARALLEL_MIN_TEST_CASES:
+            rule_methods = self._portable_rule_methods()
+            if rule_methods is not None:
+                return self._validate_in_processes(test_cases, requirements, workers, rule_methods)
+        
         validation_results = []
+        # Requirement ids are collected again on each run, in case the
+        # requirements were modified in place since the last one
+        self._requirement_ids = (None, None)
+        
+        validate = self._validate_single_test_case
+        if self.cache_size:
+            validate = self._validate_cached
+            # Cached results only hold for the requirements they were checked against
+            if requirements is not self._cache_requirements:
+                self._cache.clear()
+                self._cache_requirements = requirements
         
         for test_case in test_cases:
-            result = self._validate_single_test_case(test_case, requirements)
+            result = validate(test_case, requirements)
             validation_results.append(result)
         
         return validation_results
     
+    def _portable_rule_methods(self):
+        """
+        Return validation_rules as (rule name, method name) pairs a worker
+        process can rebuild, or None if any rule is not one of this class's
+        own methods bound to this engine.
+        """
+        if type(self) is not ValidationEngine:
+            return None
+        
+        rule_methods = []
+        for rule_name, rule_func in self.validation_rules.items():
+            func = getattr(rule_func, '__func__', None)
+            if getattr(rule_func, '__self__', None) is not self or func is None:
+                return None
+            if getattr(ValidationEngine, func.__name__, None) is not func:
+                return None
+            rule_methods.append((rule_name, func.__name__))
+        return rule_methods
+    
+    def _validate_in_processes(self, test_cases, requirements, workers, rule_methods):
+        """
+        Validate test cases in a process pool, in contiguous batches.
+        """
+        batch_size = -(-len(test_cases) // (workers * BATCHES_PER_WORKER))  # ceiling division
+        batches = [test_cases[start:start + batch_size] for start in range(0, len(test_cases), batch_size)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as executor:
+            results = executor.map(
+                _validate_batch,
+                batches,
+                [requirements] * len(batches),
+                [self.fail_fast] * len(batches),
+                [rule_methods] * len(batches)
+            )
+            # map() yields in submission order, so test case order is preserved
+            return [result for batch_results in results for result in batch_results]
+    
+    def _validate_cached(self, test_case, requirements=None):
+        """
+        Validate a single test case, reusing the cached result of a test case
+        with the same content.
+        """
+        key = tuple(test_case.get(field, '') for field in _CACHE_KEY_FIELDS)
+        # Other field types can fail the rules with type-specific messages
+        if not all(value is None or type(value) is str for value in key):
+            return self._validate_single_test_case(test_case, requirements)
+        key += (not test_case.get('test_data'),)
+        
+        cached = self._cache.get(key)
+        if cached is None:
+            result = self._validate_single_test_case(test_case, requirements)
+            self._cache[key] = _copy_result(result)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return result
+        
+        self._cache.move_to_end(key)
+        result = _copy_result(cached)
+        result['test_case_id'] = test_case.get('id', 'Unknown')
+        return result
+    
     def _validate_single_test_case(self, test_case, requirements=None):
         """
         Validate a single test case.
@@ -42,20 +256,34 @@ class ValidationEngine:
         
         total_rules = len(self.validation_rules)
         passed_rules = 0
-        
-        for rule_name, rule_func in self.validation_rules.items():
+        ctx = _LoweredFields(test_case)
+        
+        rules = self.validation_rules.items()
+        if self.fail_fast:
+            # Critical rules first (sorted() is stable), so a failing one
+            # skips the rest
+            rules = sorted(rules, key=lambda rule: rule[0] not in _CRITICAL_RULES)
+            validation_result['skipped'] = []
+        
+        for rule_name, rule_func in rules:
+            if self.fail_fast and not validation_result['is_valid']:
+                validation_result['skipped'].append(rule_name)
+                continue
             try:
-                rule_result = rule_func(test_case, requirements)
+                rule_result = rule_func(test_case, ctx, requirements)
                 validation_result['details'][rule_name] = rule_result
                 
                 if rule_result['passed']:
                     passed_rules += 1
                 else:
-                    validation_result['errors'].extend(rule_result.get('errors', []))
-                    validation_result['warnings'].extend(rule_result.get('warnings', []))
+                    # Every rule returns both lists; most of them are empty
+                    if rule_result['errors']:
+                        validation_result['errors'].extend(rule_result['errors'])
+                    if rule_result['warnings']:
+                        validation_result['warnings'].extend(rule_result['warnings'])
                     
                     # Critical rules that make test case invalid
-                    if rule_name in ['has_title', 'has_steps', 'has_expected_result']:
+                    if rule_name in _CRITICAL_RULES:
                         validation_result['is_valid'] = False
                         
             except Exception as e:
@@ -67,7 +295,7 @@ class ValidationEngine:
         
         return validation_result
     
-    def _check_title(self, test_case, requirements=None):
+    def _check_title(self, test_case, ctx, requirements=None):
         """Check if test case has a meaningful title."""
         title = test_case.get('title', '').strip()
         
@@ -85,7 +313,7 @@ class ValidationEngine:
                 'warnings': []
             }
         
-        if title.lower() in ['test case', 'test', 'untitled']:
+        if len(title) <= _LONGEST_GENERIC_TITLE and ctx['title'].strip() in _GENERIC_TITLES:
             return {
                 'passed': False,
                 'errors': ['Title is too generic - should describe what is being tested'],
@@ -94,7 +322,7 @@ class ValidationEngine:
         
         return {'passed': True, 'errors': [], 'warnings': []}
     
-    def _check_description(self, test_case, requirements=None):
+    def _check_description(self, test_case, ctx, requirements=None):
         """Check if test case has a clear description."""
         description = test_case.get('description', '').strip()
         
@@ -114,7 +342,7 @@ class ValidationEngine:
         
         return {'passed': True, 'errors': [], 'warnings': []}
     
-    def _check_steps(self, test_case, requirements=None):
+    def _check_steps(self, test_case, ctx, requirements=None):
         """Check if test case has clear, actionable steps."""
         steps = test_case.get('steps', '').strip()
         
@@ -126,25 +354,21 @@ class ValidationEngine:
             }
         
         # Check if steps are numbered or structured
-        step_patterns = [r'^\d+\.', r'^Step \d+', r'^\w+\)', r'^\-', r'^\*']
-        has_structure = any(re.search(pattern, line.strip(), re.MULTILINE) 
-                           for pattern in step_patterns 
-                           for line in steps.split('\n') if line.strip())
+        has_structure = _STEP_STRUCTURE_RE.search(steps) is not None
         
         warnings = []
         if not has_structure:
             warnings.append('Steps should be numbered or structured for clarity')
         
         # Check for action verbs
-        action_verbs = ['click', 'enter', 'select', 'verify', 'check', 'navigate', 'input', 'submit']
-        has_action_verbs = any(verb in steps.lower() for verb in action_verbs)
+        has_action_verbs = _has_action_verb(ctx['steps'])
         
         if not has_action_verbs:
             warnings.append('Steps should contain clear action verbs (click, enter, verify, etc.)')
         
         return {'passed': True, 'errors': [], 'warnings': warnings}
     
-    def _check_expected_result(self, test_case, requirements=None):
+    def _check_expected_result(self, test_case, ctx, requirements=None):
         """Check if test case has clear expected results."""
         expected = test_case.get('expected', '').strip()
         
@@ -163,8 +387,7 @@ class ValidationEngine:
             }
         
         # Check for vague language
-        vague_terms = ['should work', 'works correctly', 'functions properly', 'behaves as expected']
-        if any(term in expected.lower() for term in vague_terms):
+        if _has_vague_term(ctx['expected']):
             return {
                 'passed': False,
                 'warnings': ['Expected result is too vague - be more specific'],
@@ -173,16 +396,16 @@ class ValidationEngine:
         
         return {'passed': True, 'errors': [], 'warnings': []}
     
-    def _check_test_data(self, test_case, requirements=None):
+    def _check_test_data(self, test_case, ctx, requirements=None):
         """Check if test case specifies required test data."""
-        steps = test_case.get('steps', '').lower()
-        description = test_case.get('description', '').lower()
+        steps = ctx['steps']
+        description = ctx['description']
         
         # Look for data-related keywords
-        data_keywords = ['username', 'password', 'email', 'data', 'input', 'value', 'credentials']
-        needs_test_data = any(keyword in steps + description for keyword in data_keywords)
+        text = steps + description
+        needs_test_data = _has_data_keyword(text)
         
-        has_test_data = test_case.get('test_data') or 'test data' in (steps + description)
+        has_test_data = test_case.get('test_data') or 'test data' in text
         
         warnings = []
         if needs_test_data and not has_test_data:
@@ -190,12 +413,10 @@ class ValidationEngine:
         
         return {'passed': True, 'errors': [], 'warnings': warnings}
     
-    def _check_priority(self, test_case, requirements=None):
+    def _check_priority(self, test_case, ctx, requirements=None):
         """Check if test case has priority assigned."""
         priority = test_case.get('priority', '').strip()
         
-        valid_priorities = ['high', 'medium', 'low', 'critical', 'normal']
-        
         if not priority:
             return {
                 'passed': False,
@@ -203,16 +424,16 @@ class ValidationEngine:
                 'errors': []
             }
         
-        if priority.lower() not in valid_priorities:
+        if len(priority) > _LONGEST_PRIORITY or ctx['priority'].strip() not in _VALID_PRIORITY_SET:
             return {
                 'passed': False,
-                'warnings': [f'Priority should be one of: {", ".join(valid_priorities)}'],
+                'warnings': [f'Priority should be one of: {", ".join(_VALID_PRIORITIES)}'],
                 'errors': []
             }
         
         return {'passed': True, 'errors': [], 'warnings': []}
     
-    def _check_requirement_mapping(self, test_case, requirements=None):
+    def _check_requirement_mapping(self, test_case, ctx, requirements=None):
         """Check if test case is mapped to requirements."""
         req_id = test_case.get('requirement_id')
         
@@ -225,8 +446,12 @@ class ValidationEngine:
         
         # If requirements are provided, check if mapping is valid
         if requirements:
-            req_ids = [req.get('id') for req in requirements if req.get('id')]
-            if req_id not in req_ids:
+            try:
+                found = req_id in self._known_requirement_ids(requirements)
+            except TypeError:
+                # An unhashable id can't be one of the requirement ids
+                found = False
+            if not found:
                 return {
                     'passed': False,
                     'warnings': [f'Requirement ID {req_id} not found in SRS document'],
@@ -235,38 +460,39 @@ class ValidationEngine:
         
         return {'passed': True, 'errors': [], 'warnings': []}
     
-    def _check_step_clarity(self, test_case, requirements=None):
+    def _known_requirement_ids(self, requirements):
+        """Return the set of requirement ids, built once per validation run."""
+        cached_requirements, req_ids = self._requirement_ids
+        if cached_requirements is not requirements:
+            req_ids = frozenset(req.get('id') for req in requirements if req.get('id'))
+            self._requirement_ids = (requirements, req_ids)
+        return req_ids
+    
+    def _check_step_clarity(self, test_case, ctx, requirements=None):
         """Check if steps are clear and unambiguous."""
-        steps = test_case.get('steps', '')
+        steps = ctx['steps']
         
         # Check for ambiguous language
-        ambiguous_terms = ['might', 'could', 'maybe', 'possibly', 'probably', 'seems']
-        has_ambiguous = any(term in steps.lower() for term in ambiguous_terms)
+        has_ambiguous = _has_ambiguous_term(steps)
         
         warnings = []
         if has_ambiguous:
             warnings.append('Steps contain ambiguous language - be more definitive')
         
         # Check for passive voice (simple check)
-        passive_indicators = ['is done', 'are performed', 'will be', 'should be']
-        has_passive = any(indicator in steps.lower() for indicator in passive_indicators)
+        has_passive = _has_passive_indicator(steps)
         
         if has_passive:
             warnings.append('Consider using active voice in test steps')
         
         return {'passed': True, 'errors': [], 'warnings': warnings}
     
-    def _check_measurable_result(self, test_case, requirements=None):
+    def _check_measurable_result(self, test_case, ctx, requirements=None):
         """Check if expected result is measurable/verifiable."""
-        expected = test_case.get('expected', '').lower()
+        expected = ctx['expected']
         
         # Look for measurable criteria
-        measurable_indicators = [
-            'displays', 'shows', 'appears', 'contains', 'equals', 'returns',
-            'status code', 'message', 'error', 'success', 'redirects', 'loads'
-        ]
-        
-        has_measurable = any(indicator in expected for indicator in measurable_indicators)
+        has_measurable = _has_measurable_indicator(expected)
         
         warnings = []
         if not has_measurable:
@@ -277,12 +503,17 @@ class ValidationEngine:
     def generate_validation_summary(self, validation_results):
         """Generate a summary of validation results."""
         total_tests = len(validation_results)
-        valid_tests = sum(1 for result in validation_results if result['is_valid'])
         
-        total_errors = sum(len(result['errors']) for result in validation_results)
-        total_warnings = sum(len(result['warnings']) for result in validation_results)
+        # Count everything in one pass over the results
+        valid_tests = total_errors = total_warnings = total_score = 0
+        for result in validation_results:
+            if result['is_valid']:
+                valid_tests += 1
+            total_errors += len(result['errors'])
+            total_warnings += len(result['warnings'])
+            total_score += result['score']
         
-        avg_score = sum(result['score'] for result in validation_results) / total_tests if total_tests > 0 else 0
+        avg_score = total_score / total_tests if total_tests > 0 else 0
         
         return {
             'total_test_cases': total_tests,
@@ -89,9 +89,15 @@ class SmartSpecApp {
                 body: formData
             });
 
-            const data = await response.json();
+            let data = await response.json();
 
-            if (response.ok) {
+            // SRS documents are processed in the background; poll until done
+            if (response.status === 202) {
+                this.updateStatus(statusElement, 'Processing document...', 'info');
+                data = await this.waitForUploadJob(data.status_url);
+            }
+
+            if (response.ok && !data.error) {
                 if (type === 'srs') {
                     this.updateStatus(statusElement, 
                         `✅ Upload successful! ${data.chunks} chunks processed, ${data.requirements || 0} requirements extracted.`, 
@@ -113,6 +119,17 @@ class SmartSpecApp {
         }
     }
 
+    async waitForUploadJob(statusUrl, intervalMs = 1000) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            if (!response.ok || job.status !== 'processing') {
+                return job;
+            }
+        }
+    }
+
     async generateTestCases() {
         const query = document.getElementById('query-input').value.trim();
         const queryStatus = document.getElementById('query-status');
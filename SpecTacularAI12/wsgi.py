@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers.
+
+Application state (uploaded document, requirements, test cases) lives in
+module-level globals, so run a single worker process and scale with threads:
+
+    gunicorn -w 1 -k gthread --threads 4 -b 0.0.0.0:5000 wsgi:application
+"""
+
+from app import app, create_directories
+
+create_directories()
+
+application = app